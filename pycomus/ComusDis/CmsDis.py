@@ -8,7 +8,7 @@ import os
 from typing import List, Union, Tuple
 
 import pycomus
-from pycomus.ComusDis.GridCell import GridCell
+from pycomus.ComusDis.GridCell import GridArrays, GridCells
 from pycomus.ComusDis.GridLyr import LpfLayers, BcfLayers
 from pycomus.Utils.CONSTANTS import LPF_LYR_FILE_NAME, BCF_LYR_FILE_NAME, LPF_LYR_PKG_NAME, BCF_LYR_PKG_NAME, \
     GRID_SPACE_FILE_NAME, CON_PKG_NAME
@@ -223,12 +223,12 @@ class ComusDisLpf(ComusDis):
             raise ValueError("lyr_ibs length should be the same as num_lyr!")
         if not all(x in [0, 1] for x in lyr_ibs):
             raise ValueError("The data in lyr_ibs should be in [0: IBS-Disable, 1: IBS-Enable]!")
+        model.grid_arrays = GridArrays(num_lyr, num_row, num_col)
         model.layers = []
         for i in range(num_lyr):
-            grid_cell: List[List[GridCell]] = [[GridCell() for _ in range(num_col)] for _ in range(num_row)]
             model.layers.append(
                 LpfLayers(i + 1, lyr_type=lyr_type[i], lyr_cbd=lyr_cbd[i], lyr_ibs=lyr_ibs[i],
-                          grid_cells=grid_cell))
+                          grid_cells=GridCells(model.grid_arrays, i)))
         self.lyr_type = lyr_type
         self.lyr_cbd = lyr_cbd
         self.lyr_ibs = lyr_ibs
@@ -391,12 +391,13 @@ class ComusDisBcf(ComusDis):
             raise ValueError("lyr_ibs length should be the same as num_lyr!")
         if not all(x in [0, 1] for x in lyr_ibs):
             raise ValueError("The data in lyr_ibs should be in [0:IBS-Disable,1:IBS-Enable]!")
+        model.grid_arrays = GridArrays(num_lyr, num_row, num_col)
         model.layers = []
         self._model = model
         for i in range(num_lyr):
-            gridCell = [[GridCell() for _ in range(num_col)] for _ in range(num_row)]
             model.layers.append(
-                BcfLayers(i + 1, lyr_type=lyr_type[i], lyr_trpy=lyr_trpy[i], lyr_ibs=lyr_ibs[i], grid_cells=gridCell))
+                BcfLayers(i + 1, lyr_type=lyr_type[i], lyr_trpy=lyr_trpy[i], lyr_ibs=lyr_ibs[i],
+                          grid_cells=GridCells(model.grid_arrays, i)))
         model.package[BCF_LYR_PKG_NAME] = self
         self.lyr_type = lyr_type
         self.lyr_trpy = lyr_trpy
@@ -5,13 +5,14 @@
 # Description: Set COMUS Model GridCell Parameter Attributes.
 # --------------------------------------------------------------
 import os
+import warnings
 from typing import Union
 
 import numpy as np
 
-from pycomus.ComusDis.GridCell import GridCell
 from pycomus.Utils.CONSTANTS import BCF_GRID_FILE_NAME, LPF_GRID_FILE_NAME, GRID_PKG_NAME, BCF_LYR_PKG_NAME, \
     LPF_LYR_PKG_NAME, CON_PKG_NAME
+from pycomus.Utils.TextTable import CHUNK_ROWS, write_table, grid_index_columns
 
 
 class ComusGridPars:
@@ -109,7 +110,6 @@ class ComusGridPars:
         else:
             raise ValueError(
                 f"top must be a 2D numpy array(int, float, numpy array) with shape ({self._num_row}, {self._num_col})")
-        self.__SetTop()
 
         # bot Check
         if isinstance(bot, np.ndarray):
@@ -350,136 +350,82 @@ class ComusGridPars:
         num_col: int = cms_dis.num_col
         intblkm: int = cms_pars.intblkm
         expLength = num_lyr * num_row * num_col
-        with open(grid_params_file, 'r') as file:
-            lines = file.readlines()
-
-        if len(lines) != expLength + 1:
-            raise ValueError(f"The Grid Attribute Params file should have exactly {expLength + 1} lines of data.")
-
-        # Check BCF And LPF
+        num_fields = 13 if intblkm == 1 else 15
+        grid_format = "BCF" if intblkm == 1 else "LPF"
+        shape = (num_lyr, num_row, num_col)
+        # Data column of each parameter, ky is kx * hani
         if intblkm == 1:
-            if len(lines[0].strip().split()) != 13:
-                raise ValueError("The BCF Grid Attribute Params file header should have 13 fields.")
-            data = lines[1].strip().split()
-            if len(data) != 13:
-                raise ValueError("The BCF Grid Attribute Params data line should have 13 values.")
+            par_columns = {"ibound": 3, "bot": 5, "transm": 6, "kx": 7, "vcont": 8, "sc1": 9, "sc2": 10, "wet_dry": 11,
+                           "shead": 12}
+            top_column = 4
         else:
-            if len(lines[0].strip().split()) != 15:
-                raise ValueError("The LPF Grid Attribute Params file header should have 15 fields.")
-            data = lines[1].strip().split()
-            if len(data) != 15:
-                raise ValueError("The LPF Grid Attribute Params data line should have 15 values.")
-
-        # Load Data
-        lines = lines[1:]
-        ibound_ndarray = np.zeros((num_lyr, num_row, num_col))
+            par_columns = {"bot": 4, "ibound": 5, "kx": 6, "kz": 8, "vkcb": 9, "tkcb": 10, "sc1": 11, "sc2": 12,
+                           "wet_dry": 13, "shead": 14}
+            top_column = 3
+        pars = {name: np.zeros(shape) for name in par_columns}
+        if intblkm == 2:
+            pars["ky"] = np.zeros(shape)
         top_ndarray = np.zeros((num_row, num_col))
-        bot_ndarray = np.zeros((num_lyr, num_row, num_col))
-        kx_ndarray = np.zeros((num_lyr, num_row, num_col))
-        sc1_ndarray = np.zeros((num_lyr, num_row, num_col))
-        sc2_ndarray = np.zeros((num_lyr, num_row, num_col))
-        wetdry_ndarray = np.zeros((num_lyr, num_row, num_col))
-        shead_ndarray = np.zeros((num_lyr, num_row, num_col))
-        if intblkm == 1:
-            transm_ndarray = np.zeros((num_lyr, num_row, num_col))
-            vcont_ndarray = np.zeros((num_lyr, num_row, num_col))
-            for line in lines:
-                line = line.strip().split()
-                lyr = int(line[0]) - 1
-                row = int(line[1]) - 1
-                col = int(line[2]) - 1
-                ibound_ndarray[lyr, row, col] = int(line[3])
-                if lyr == 0:
-                    top_ndarray[row, col] = float(line[4])
-                bot_ndarray[lyr, row, col] = float(line[5])
-                transm_ndarray[lyr, row, col] = float(line[6])
-                kx_ndarray[lyr, row, col] = float(line[7])
-                vcont_ndarray[lyr, row, col] = float(line[8])
-                sc1_ndarray[lyr, row, col] = float(line[9])
-                sc2_ndarray[lyr, row, col] = float(line[10])
-                wetdry_ndarray[lyr, row, col] = float(line[11])
-                shead_ndarray[lyr, row, col] = float(line[12])
-            instance = cls(model, ibound=ibound_ndarray, top=top_ndarray, bot=bot_ndarray, transm=transm_ndarray,
-                           kx=kx_ndarray, vcont=vcont_ndarray, sc1=sc1_ndarray, sc2=sc2_ndarray, wet_dry=wetdry_ndarray,
-                           shead=shead_ndarray)
-            return instance
-        else:
-            ky_ndarray = np.zeros((num_lyr, num_row, num_col))
-            kz_ndarray = np.zeros((num_lyr, num_row, num_col))
-            vkcb_ndarray = np.zeros((num_lyr, num_row, num_col))
-            tkcb_ndarray = np.zeros((num_lyr, num_row, num_col))
-            for line in lines:
-                line = line.strip().split()
-                lyr = int(line[0]) - 1
-                row = int(line[1]) - 1
-                col = int(line[2]) - 1
-                if lyr == 0:
-                    top_ndarray[row, col] = float(line[3])
-                bot_ndarray[lyr, row, col] = float(line[4])
-                ibound_ndarray[lyr, row, col] = int(line[5])
-                kx_ndarray[lyr, row, col] = float(line[6])
-                ky_ndarray[lyr, row, col] = float(line[6]) * float(line[7])
-                kz_ndarray[lyr, row, col] = float(line[8])
-                vkcb_ndarray[lyr, row, col] = float(line[9])
-                tkcb_ndarray[lyr, row, col] = float(line[10])
-                sc1_ndarray[lyr, row, col] = float(line[11])
-                sc2_ndarray[lyr, row, col] = float(line[12])
-                wetdry_ndarray[lyr, row, col] = float(line[13])
-                shead_ndarray[lyr, row, col] = float(line[14])
-            instance = cls(model, top=top_ndarray, bot=bot_ndarray, ibound=ibound_ndarray, kx=kx_ndarray,
-                           ky=ky_ndarray, kz=kz_ndarray, vkcb=vkcb_ndarray, tkcb=tkcb_ndarray, sc1=sc1_ndarray,
-                           sc2=sc2_ndarray, wet_dry=wetdry_ndarray, shead=shead_ndarray)
-            return instance
-
-    def __SetTop(self):
-        for row in range(self._num_row):
-            for col in range(self._num_col):
-                self._model.layers[0].grid_cells[row][col].top = self.top[row][col]
+
+        with open(grid_params_file, 'r') as file:
+            if len(file.readline().strip().split()) != num_fields:
+                raise ValueError(f"The {grid_format} Grid Attribute Params file header should have {num_fields} fields.")
+            num_read = 0
+            while num_read < expLength:
+                # Bulk parse the data lines in C a chunk at a time, then scatter them by (lyr, row, col)
+                try:
+                    with warnings.catch_warnings():
+                        warnings.simplefilter("ignore", UserWarning)
+                        data = np.loadtxt(file, dtype=float, ndmin=2, max_rows=min(CHUNK_ROWS, expLength - num_read))
+                except ValueError:
+                    raise ValueError(f"The {grid_format} Grid Attribute Params data line should have {num_fields} "
+                                     f"values.")
+                if data.shape[0] == 0:
+                    break
+                if data.shape[1] != num_fields:
+                    raise ValueError(f"The {grid_format} Grid Attribute Params data line should have {num_fields} "
+                                     f"values.")
+                num_read += data.shape[0]
+                lyr, row, col = (data[:, i].astype(np.int64) - 1 for i in range(3))
+                for name, column in par_columns.items():
+                    pars[name][lyr, row, col] = data[:, column]
+                if intblkm == 2:
+                    pars["ky"][lyr, row, col] = data[:, 6] * data[:, 7]
+                first_lyr = lyr == 0
+                top_ndarray[row[first_lyr], col[first_lyr]] = data[first_lyr, top_column]
+            if num_read != expLength or file.read().strip():
+                raise ValueError(f"The Grid Attribute Params file should have exactly {expLength + 1} lines of data.")
+
+        instance = cls(model, top=top_ndarray, **pars)
+        return instance
 
     def __SetComPars(self):
-        for layer in range(self._num_lyr):
-            for row in range(self._num_row):
-                for col in range(self._num_col):
-                    # BOT
-                    self._model.layers[layer].grid_cells[row][col].bot = self.bot[layer, row, col]
-                    # TOP
-                    if layer < self._num_lyr - 1:
-                        self._model.layers[layer + 1].grid_cells[row][col].top = self.bot[layer, row, col]
-                    # IBOUND
-                    self._model.layers[layer].grid_cells[row][col].ibound = self.ibound[layer, row, col]
-                    # SHEAD
-                    self._model.layers[layer].grid_cells[row][col].shead = self.shead[layer, row, col]
-                    # HK
-                    self._model.layers[layer].grid_cells[row][col].hk = self.kx[layer, row, col]
-                    # WETDRY
-                    self._model.layers[layer].grid_cells[row][col].wetdry = self.wet_dry[layer, row, col]
-                    # sc1
-                    self._model.layers[layer].grid_cells[row][col].sc1 = self.sc1[layer, row, col]
+        grid_arrays = self._model.grid_arrays
+        grid_arrays.bot = np.array(self.bot)
+        grid_arrays.ibound = np.array(self.ibound)
+        grid_arrays.shead = np.array(self.shead)
+        grid_arrays.hk = np.array(self.kx)
+        grid_arrays.wetdry = np.array(self.wet_dry)
+        grid_arrays.sc1 = np.array(self.sc1)
+        # TOP of the lower layers is the BOT of the layer above
+        grid_arrays.top = np.concatenate((self.top[np.newaxis], self.bot[:-1]))
 
     def __SetBcfPars(self):
-        for layer in range(self._num_lyr):
-            for row in range(self._num_row):
-                for col in range(self._num_col):
-                    self._model.layers[layer].grid_cells[row][col].tran = self.transm[layer, row, col]
-                    if layer < self._num_lyr - 1:
-                        self._model.layers[layer].grid_cells[row][col].vcont = self.vcont[layer, row, col]
-                    self._model.layers[layer].grid_cells[row][col].sc2 = self.sc2[layer, row, col]
+        grid_arrays = self._model.grid_arrays
+        grid_arrays.tran = np.array(self.transm)
+        grid_arrays.vcont = np.zeros(grid_arrays.shape, dtype=np.result_type(self.vcont, float))
+        grid_arrays.vcont[:-1] = self.vcont[:-1]
+        grid_arrays.sc2 = np.array(self.sc2)
 
     def __SetLpfPars(self):
-        for layer in range(self._num_lyr):
-            for row in range(self._num_row):
-                for col in range(self._num_col):
-                    # HANI
-                    if self.kx[layer, row, col] != 0:
-                        self._model.layers[layer].grid_cells[row][col].hani = self.ky[layer, row, col] / self.kx[
-                            layer, row, col]
-                    else:
-                        self._model.layers[layer].grid_cells[row][col].hani = 0
-                    # VKA
-                    self._model.layers[layer].grid_cells[row][col].vka = self.kz[layer, row, col]
-                    self._model.layers[layer].grid_cells[row][col].vkcb = self.vkcb[layer, row, col]
-                    self._model.layers[layer].grid_cells[row][col].tkcb = self.tkcb[layer, row, col]
-                    self._model.layers[layer].grid_cells[row][col].sc2 = self.sc2[layer, row, col]
+        grid_arrays = self._model.grid_arrays
+        # HANI, 0 where kx is 0
+        grid_arrays.hani = np.divide(self.ky, self.kx, out=np.zeros(grid_arrays.shape), where=self.kx != 0)
+        # VKA
+        grid_arrays.vka = np.array(self.kz)
+        grid_arrays.vkcb = np.array(self.vkcb)
+        grid_arrays.tkcb = np.array(self.tkcb)
+        grid_arrays.sc2 = np.array(self.sc2)
 
     def __ShowErrorMsg(self, parName):
         raise ValueError(
@@ -507,25 +453,19 @@ class ComusGridPars:
         :param folder_path: Output folder path.
         """
         ctrl_pars = self._model.package[CON_PKG_NAME]
+        grid = self._model.grid_arrays
+        index_columns = grid_index_columns(self._num_lyr, self._num_row, self._num_col)
+        ibound = grid.ibound.astype(np.int64)
         if ctrl_pars.intblkm == 1:
             with open(os.path.join(folder_path, BCF_GRID_FILE_NAME), "w") as file:
                 file.write("ILYR  IROW  ICOL  IBOUND  CELLTOP  CELLBOT  TRANSM  HK  VCONT  SC1  SC2  WETDRY  SHEAD\n")
-                for layer in range(self._num_lyr):
-                    for row in range(self._num_row):
-                        for col in range(self._num_col):
-                            grid_cell: GridCell = self._model.layers[layer].grid_cells[row][col]
-                            file.write(
-                                f"{int(layer + 1)}  {int(row + 1)}  {int(col + 1)}  {int(grid_cell.ibound)}  {grid_cell.top}  {grid_cell.bot}  {grid_cell.tran}"
-                                f"  {grid_cell.hk}  {grid_cell.vcont}  {grid_cell.sc1}  {grid_cell.sc2}  {grid_cell.wetdry}  {grid_cell.shead}\n")
+                write_table(file, index_columns + [column.ravel() for column in (
+                    ibound, grid.top, grid.bot, grid.tran, grid.hk, grid.vcont, grid.sc1, grid.sc2, grid.wetdry,
+                    grid.shead)], float_format=self._model.float_format)
         else:
             with open(os.path.join(folder_path, LPF_GRID_FILE_NAME), "w") as file:
                 file.write("ILYR  IROW  ICOL  CELLTOP  CELLBOT  IBOUND  HK  HANI  VKA  VKCB  TKCB  SC1  SC2  "
                            "WETDRY  SHEAD\n")
-                for layer in range(self._num_lyr):
-                    for row in range(self._num_row):
-                        for col in range(self._num_col):
-                            grid_cell: GridCell = self._model.layers[layer].grid_cells[row][col]
-                            file.write(
-                                f"{int(layer + 1)}  {int(row + 1)}  {int(col + 1)}  {grid_cell.top}  {grid_cell.bot}  {int(grid_cell.ibound)}  {grid_cell.hk}"
-                                f"  {grid_cell.hani}  {grid_cell.vka}  {grid_cell.vkcb}  {grid_cell.tkcb}  {grid_cell.sc1}  {grid_cell.sc2}"
-                                f"  {grid_cell.wetdry}  {grid_cell.shead}\n")
+                write_table(file, index_columns + [column.ravel() for column in (
+                    grid.top, grid.bot, ibound, grid.hk, grid.hani, grid.vka, grid.vkcb, grid.tkcb, grid.sc1, grid.sc2,
+                    grid.wetdry, grid.shead)], float_format=self._model.float_format)
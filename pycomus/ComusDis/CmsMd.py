@@ -4,11 +4,21 @@
 # Author: Zhenjiang Wu
 # Description: Create A COMUS Model Object.
 # --------------------------------------------------------------
-import ctypes
 import os.path
-import platform
+import shutil
+import tempfile
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Dict, Union
+
+import numpy as np
 
 from pycomus.Utils import CONSTANTS
+from pycomus.Utils.ResultCache import input_fingerprint, model_fingerprint, output_complete
+from pycomus.Utils.SolverProcess import StepEvent, pool_context, run_error, run_solver, start_solver
+from pycomus.Utils.TextTable import check_float_format
+from pycomus.Utils.WriteManifest import (WriteReport, is_current, load_manifest, manifest_entry, package_digests,
+                                         save_manifest)
 
 
 class ComusModel:
@@ -19,17 +29,36 @@ class ComusModel:
     -----------
     model_name : str
         COMUS Model Name
+    grid_arrays : pycomus.ComusDis.GridCell.GridArrays
+        Grid cell parameters of every layer as (num_lyr, num_row, num_col) arrays, set by `pycomus.ComusDisLpf` or
+        `pycomus.ComusDisBcf`. `layers[i].grid_cells[row][col]` are views of these arrays.
+    float_format : str or None
+        Float format of the grid and boundary input files. None writes the shortest text that round-trips the
+        float64 value, "float32" the shortest text that round-trips the value rounded to float32, and a printf style
+        format such as "%.8g" formats every float with it.
+    workspace : str or None
+        Folder that holds the model folder <model_name>, None uses the current working directory at the time the
+        files are written, the model is run or its output is read.
+    model_path : str
+        Path of the model folder, which holds <Data.in> and <Data.out>.
 
     Methods:
     --------
-    __init__(self, model_name: str = "ComusTest")
+    __init__(self, model_name: str = "ComusTest", float_format: Union[str, None] = None,
+             workspace: Union[str, None] = None)
         Instantiate an instance of ComusModel.
 
-    write_files(self)
+    write_files(self, workers: Union[int, None] = 1, incremental: bool = False) -> WriteReport
         Compile the input data and save it in the <Data.in> directory located at runtime.
 
-    run(self)
-        Run COMUS Model.
+    run(self, cache=None)
+        Run COMUS Model, or copy its result from a result cache.
+
+    fingerprint(self) -> str
+        Deterministic fingerprint of the simulation input of the model.
+
+    run_async(self, on_step=None) -> concurrent.futures.Future
+        Run COMUS Model in a worker process without waiting for it.
 
     Returns:
     --------
@@ -40,20 +69,59 @@ class ComusModel:
     --------
     >>> import pycomus
     >>> model1 = pycomus.ComusModel(model_name="test")
+    >>> model2 = pycomus.ComusModel(model_name="test", float_format="%.8g")
+    >>> model3 = pycomus.ComusModel(model_name="test", workspace="./runs/run1")
     """
 
-    def __init__(self, model_name: str = "ComusTest"):
+    def __init__(self, model_name: str = "ComusTest", float_format: Union[str, None] = None,
+                 workspace: Union[str, None] = None):
         if not isinstance(model_name, str):
             raise ValueError("model_name should be of type str.")
+        if workspace is not None and not isinstance(workspace, str):
+            raise ValueError("workspace should be of type str or None.")
         self.model_name: str = model_name
+        self.float_format: Union[str, None] = check_float_format(float_format)
+        self.workspace: Union[str, None] = workspace
         self.package = {}
         self.layers = []
+        self.grid_arrays = None
+
+    @property
+    def model_path(self) -> str:
+        """
+        Path of the model folder, which holds <Data.in> and <Data.out>.
+
+        :return: str
+        """
+        return os.path.join(os.path.abspath(self.workspace) if self.workspace else os.getcwd(), self.model_name)
 
-    def write_files(self) -> None:
+    def write_files(self, workers: Union[int, None] = 1, incremental: bool = False) -> WriteReport:
         """
         Compile the input data and save it in the <Data.in> directory located at runtime.
 
+        Every package writes its own file, with `workers` greater than 1 the packages are written concurrently by a
+        pool of worker processes. A package that fails does not stop the others, the failures are reported
+        together, in package order, once all packages are done.
+
+        With `incremental` the content hash of every package and of the files it wrote are kept in
+        <Data.in.manifest> next to <Data.in>, and a package is only written again if its content or one of its files
+        changed since.
+
+        :param workers: int
+            Number of worker processes, 1 writes the packages one after another in this process, None uses one
+            process per CPU.
+        :param incremental: bool
+            Skip the packages that are unchanged since they were last written.
+        :return: WriteReport
+            Time spent writing each package, and the files that were written and skipped.
         """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if not isinstance(workers, (int, np.integer)) or workers < 1:
+            raise ValueError("workers should be an int greater than or equal to 1.")
+        workers = int(workers)
+        if not isinstance(incremental, bool):
+            raise ValueError("incremental should be of type bool.")
         required_packages = [
             CONSTANTS.CON_PKG_NAME, CONSTANTS.OUT_PKG_NAME,
             CONSTANTS.GRID_PKG_NAME, CONSTANTS.PERIOD_PKG_NAME
@@ -74,8 +142,7 @@ class ComusModel:
                     "In the control parameter settings, the LPF mode has been designated for use, but "
                     "<pycomus.ComusDisLpf> has not been implemented.")
 
-        folder_name = self.model_name
-        folder_path = os.path.join(os.getcwd(), folder_name, "Data.in")
+        folder_path = os.path.join(self.model_path, "Data.in")
         os.makedirs(folder_path, exist_ok=True)
         SIM_FLAGS = {
             "RCH": 0, "GHB": 0, "DRN": 0, "SHB": 0, "WEL": 0,
@@ -93,36 +160,135 @@ class ComusModel:
             file.write(
                 f"{SIM_FLAGS['SHB']}  {SIM_FLAGS['GHB']}  {SIM_FLAGS['RCH']}  {SIM_FLAGS['WEL']}  {SIM_FLAGS['DRN']}  {SIM_FLAGS['EVT']}  {SIM_FLAGS['HFB']}  {SIM_FLAGS['RIV']}  {SIM_FLAGS['STR']}  {SIM_FLAGS['RES']}  {SIM_FLAGS['LAK']}  {SIM_FLAGS['IBS']}  {SIM_FLAGS['SUB']}")
 
-        for pkg in self.package.values():
-            pkg.write_file(folder_path)
+        manifest_path = os.path.join(self.model_path, CONSTANTS.IN_MANIFEST_FILE_NAME)
+        manifest = {}
+        names = list(self.package)
+        skipped = {}
+        if incremental:
+            manifest = load_manifest(manifest_path)
+            digests = package_digests(self)
+            names = [name for name in self.package if not is_current(folder_path, manifest.get(name), digests[name])]
+            skipped = {name: sorted(manifest[name]["files"]) for name in self.package if name not in names}
+        elif os.path.exists(manifest_path):
+            os.remove(manifest_path)
+        manifest = {name: entry for name, entry in manifest.items() if name in skipped}
+
+        # Every package writes into its own temporary folder first, which tells the files it writes
+        work_paths = {name: tempfile.mkdtemp(prefix=f".{name}.", dir=folder_path) for name in names}
+        try:
+            timings = self._write_packages(work_paths, workers)
+            written = {}
+            for name, work_path in work_paths.items():
+                written[name] = sorted(os.listdir(work_path))
+                for file_name in written[name]:
+                    os.replace(os.path.join(work_path, file_name), os.path.join(folder_path, file_name))
+                if incremental:
+                    manifest[name] = manifest_entry(digests[name], folder_path, written[name])
+        finally:
+            for work_path in work_paths.values():
+                shutil.rmtree(work_path, ignore_errors=True)
+            if incremental:
+                save_manifest(manifest_path, manifest)
+        return WriteReport(timings, written, skipped)
+
+    def _write_packages(self, folder_paths: Dict[str, str], workers: int) -> Dict[str, float]:
+        if workers == 1 or len(folder_paths) < 2:
+            timings = {}
+            for name, folder_path in folder_paths.items():
+                start = time.perf_counter()
+                self.package[name].write_file(folder_path)
+                timings[name] = time.perf_counter() - start
+            return timings
 
-    def run(self) -> None:
+        # Other start methods than fork receive the model pickled once per worker
+        with ProcessPoolExecutor(max_workers=min(workers, len(folder_paths)), mp_context=pool_context(),
+                                 initializer=_init_writer, initargs=(self,)) as executor:
+            futures = {name: executor.submit(_write_package, name, folder_path)
+                       for name, folder_path in folder_paths.items()}
+        timings = {}
+        failures = []
+        for name, future in futures.items():
+            error = future.exception()
+            if error is None:
+                timings[name] = future.result()
+            else:
+                failures.append((name, error))
+        if failures:
+            raise ValueError("Failed to write the packages: " + "; ".join(
+                f"{name}: {type(error).__name__}({error})" for name, error in failures)) from failures[0][1]
+        return timings
+
+    def run(self, cache=None) -> None:
         """
         Run COMUS Model.
 
+        With a result cache, a model whose written input files (see `pycomus.Utils.ResultCache.input_fingerprint`)
+        are already stored gets a copy of the stored <Data.out> instead of being run. Otherwise the solver runs in a
+        worker process, and its result is stored only if the simulation completed and every grid cell output file
+        asked for by `pycomus.ComusOutputPars` was written.
+
+        :param cache: pycomus.ComusResultCache or None
         """
-        system = platform.system()
-        current_file_path = os.path.abspath(__file__)
-        current_dir_path = os.path.dirname(current_file_path)
-        if system == 'Windows':
-            dll_path = os.path.join(current_dir_path, '.././Utils', 'WinComus.dll')
-            comusModel = ctypes.CDLL(dll_path)
-            comusModel.RunModel.argtypes = [ctypes.c_wchar_p]
-            comusModel.RunModel.restype = ctypes.c_int
-            data_path = os.path.join(os.getcwd(), self.model_name)
-            comusModel.RunModel(data_path)
-        elif system == 'Linux':
-            dll_path = os.path.join(current_dir_path, '.././Utils', 'LinuxComus.so')
-            comusModel = ctypes.CDLL(dll_path)
-            comusModel.RunModel.argtypes = [ctypes.c_char_p]
-            comusModel.RunModel.restype = ctypes.c_int
-            data_path = os.path.join(os.getcwd(), self.model_name)
-            comusModel.RunModel(ctypes.c_char_p(data_path.encode('utf-8')))
-        else:
-            raise ValueError("PyCOMUS only supports Windows and Linux systems.")
+        if cache is None:
+            run_solver(self.model_path)
+            return
+        fingerprint = input_fingerprint(self.model_path)
+        out_path = os.path.join(self.model_path, "Data.out")
+        if cache.get(fingerprint, out_path):
+            return
+        # The console output is shown while the solver runs, as without a cache
+        result = start_solver(self.model_path, on_line=lambda line: print(line, end="", flush=True)).result()
+        if run_error(result) is None and output_complete(self, out_path):
+            cache.put(fingerprint, out_path)
+
+    def fingerprint(self) -> str:
+        """
+        Deterministic fingerprint of the simulation input of the model: the arrays and settings of every package,
+        the layers, the grid cell parameters, the float format and the solver library. The model name and workspace
+        are not part of it. It describes the model in memory, the result cache of `run` is keyed by the written
+        input files instead.
+
+        :return: str
+        """
+        return model_fingerprint(self)
+
+    def run_async(self, on_step: Union[Callable[[StepEvent], None], None] = None) -> Future:
+        """
+        Run COMUS Model in a worker process without waiting for it.
+
+        The solver does not block the interpreter and a solver crash does not end it. The returned future is done
+        when the run ends, with the exit code, the wall time, the console output of the solver and the progress of
+        every time step parsed from it (outer iterations, maximum head change, wall time) as a
+        `pycomus.Utils.SolverProcess.RunResult`. In an asyncio event loop, await `asyncio.wrap_future(future)`.
+
+        :param on_step: Callable[[StepEvent], None] or None
+            Called, from a background thread, with the `pycomus.Utils.SolverProcess.StepEvent` of every time step
+            as soon as the solver ends it.
+        :return: concurrent.futures.Future
+        """
+        return start_solver(self.model_path, on_step)
 
     def __str__(self):
         return f"ComusModel:\n    COMUS Model Name: {self.model_name}"
 
     def __repr__(self):
         return f"ComusModel(model_name='{self.model_name}')"
+
+
+# Model written by a worker process of `ComusModel.write_files`
+_writer_model = None
+
+
+def _init_writer(model: ComusModel):
+    global _writer_model
+    _writer_model = model
+
+
+def _write_package(name: str, folder_path: str) -> float:
+    start = time.perf_counter()
+    try:
+        _writer_model.package[name].write_file(folder_path)
+    except SystemExit as error:
+        # Reported by the pool as a bare SystemExit otherwise, without the package that stopped
+        raise ValueError(f"Package <{name}> stopped writing with sys.exit({error.code!r}).") from None
+    return time.perf_counter() - start
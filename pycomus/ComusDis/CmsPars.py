@@ -220,6 +220,12 @@ class ComusConPars:
             file.write(header_line + "\n")
             file.write('    '.join(map(str, conParsData)))
 
+    def __getstate__(self):
+        # The ctypes handle of the check library cannot be pickled, it is only used to check the parameters on init
+        state = self.__dict__.copy()
+        state["_CheckLib"] = None
+        return state
+
     def _SetDlls(self):
         current_file_path = os.path.abspath(__file__)
         current_dir_path = os.path.dirname(current_file_path)
@@ -1,16 +1,99 @@
+from typing import Iterator, Tuple
+
+import numpy as np
+
+# Parameters of a grid cell, ibound is stored as int and the others as float
+GRID_CELL_ATTRS: Tuple[str, ...] = ("ibound", "top", "bot", "tran", "hk", "vcont", "hani", "vka", "vkcb", "tkcb",
+                                    "sc1", "sc2", "wetdry", "shead")
+
+
+class GridArrays:
+    """
+    Grid cell parameters of every layer, one (num_lyr, num_row, num_col) array per parameter.
+    """
+
+    def __init__(self, num_lyr: int, num_row: int, num_col: int):
+        self.shape: Tuple[int, int, int] = (num_lyr, num_row, num_col)
+        self.ibound: np.ndarray = np.zeros(self.shape, dtype=np.int32)
+        self.top: np.ndarray = np.zeros(self.shape)
+        self.bot: np.ndarray = np.zeros(self.shape)
+        self.tran: np.ndarray = np.zeros(self.shape)
+        self.hk: np.ndarray = np.zeros(self.shape)
+        self.vcont: np.ndarray = np.zeros(self.shape)
+        self.hani: np.ndarray = np.zeros(self.shape)
+        self.vka: np.ndarray = np.zeros(self.shape)
+        self.vkcb: np.ndarray = np.zeros(self.shape)
+        self.tkcb: np.ndarray = np.zeros(self.shape)
+        self.sc1: np.ndarray = np.zeros(self.shape)
+        self.sc2: np.ndarray = np.zeros(self.shape)
+        self.wetdry: np.ndarray = np.zeros(self.shape)
+        self.shead: np.ndarray = np.zeros(self.shape)
+
+
 class GridCell:
-    def __init__(self):
-        self.ibound = 0
-        self.top = 0.0
-        self.bot = 0.0
-        self.tran = 0.0
-        self.hk = 0.0
-        self.vcont = 0.0
-        self.hani = 0.0
-        self.vka = 0.0
-        self.vkcb = 0.0
-        self.tkcb = 0.0
-        self.sc1 = 0.0
-        self.sc2 = 0.0
-        self.wetdry = 0.0
-        self.shead = 0.0
+    """
+    View of one grid cell of `GridArrays`, reading or setting an attribute reads or sets the array element.
+    """
+    __slots__ = ("_arrays", "_index")
+
+    def __init__(self, arrays: GridArrays = None, layer: int = 0, row: int = 0, col: int = 0):
+        object.__setattr__(self, "_arrays", arrays if arrays is not None else GridArrays(1, 1, 1))
+        object.__setattr__(self, "_index", (layer, row, col))
+
+    def __getattr__(self, name: str):
+        if name not in GRID_CELL_ATTRS:
+            raise AttributeError(f"'GridCell' object has no attribute '{name}'")
+        return getattr(self._arrays, name)[self._index]
+
+    def __setattr__(self, name: str, value):
+        if name not in GRID_CELL_ATTRS:
+            raise AttributeError(f"'GridCell' object has no attribute '{name}'")
+        getattr(self._arrays, name)[self._index] = value
+
+
+class GridRow:
+    """
+    View of one row of a layer, `row[col]` is a `GridCell`.
+    """
+    __slots__ = ("_arrays", "_layer", "_row")
+
+    def __init__(self, arrays: GridArrays, layer: int, row: int):
+        self._arrays = arrays
+        self._layer = layer
+        self._row = row
+
+    def __len__(self) -> int:
+        return self._arrays.shape[2]
+
+    def __getitem__(self, col: int) -> GridCell:
+        return GridCell(self._arrays, self._layer, self._row, _check_index(col, self._arrays.shape[2]))
+
+    def __iter__(self) -> Iterator[GridCell]:
+        return (GridCell(self._arrays, self._layer, self._row, col) for col in range(len(self)))
+
+
+class GridCells:
+    """
+    View of the grid cells of one layer, `grid_cells[row][col]` is a `GridCell`.
+    """
+    __slots__ = ("_arrays", "_layer")
+
+    def __init__(self, arrays: GridArrays, layer: int):
+        self._arrays = arrays
+        self._layer = layer
+
+    def __len__(self) -> int:
+        return self._arrays.shape[1]
+
+    def __getitem__(self, row: int) -> GridRow:
+        return GridRow(self._arrays, self._layer, _check_index(row, self._arrays.shape[1]))
+
+    def __iter__(self) -> Iterator[GridRow]:
+        return (GridRow(self._arrays, self._layer, row) for row in range(len(self)))
+
+
+def _check_index(index: int, size: int) -> int:
+    index = int(index)
+    if index < -size or index >= size:
+        raise IndexError("list index out of range")
+    return index % size
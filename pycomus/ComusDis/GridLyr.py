@@ -1,10 +1,8 @@
-from typing import List
-
-from .GridCell import GridCell
+from .GridCell import GridCells
 
 
 class LpfLayers:
-    def __init__(self, lyr_id: int, lyr_type: int, lyr_cbd: int, lyr_ibs: int, grid_cells: List[List[GridCell]]):
+    def __init__(self, lyr_id: int, lyr_type: int, lyr_cbd: int, lyr_ibs: int, grid_cells: GridCells):
         self.lyr_id = lyr_id
         self.lyr_type = lyr_type
         self.lyr_cbd = lyr_cbd
@@ -13,7 +11,7 @@ class LpfLayers:
 
 
 class BcfLayers:
-    def __init__(self, lyr_id: int, lyr_type: int, lyr_trpy: float, lyr_ibs: int, grid_cells: List[List[GridCell]]):
+    def __init__(self, lyr_id: int, lyr_type: int, lyr_trpy: float, lyr_ibs: int, grid_cells: GridCells):
         self.lyr_id = lyr_id
         self.lyr_type = lyr_type
         self.lyr_trpy = lyr_trpy
@@ -6,33 +6,38 @@
 # --------------------------------------------------------------
 import os
 import sys
-from typing import Union, Dict
+from typing import Union, Dict, Tuple
 
 import numpy as np
 
 import pycomus
-from pycomus.Utils import BoundaryCheck
+from pycomus.Utils import BoundaryCheck, BoundaryIO
 from pycomus.Utils.CONSTANTS import DRN_PKG_NAME, DRN_FILE_NAME
+from pycomus.Utils.CellList import cell_values
 
 
 class ComusDrn:
     """
     Initialize the COMUS Model with the Drainage(DRN) package.
 
+    The value of a stress period can also be given as a cell list `(cells, values)`, `cells` being the
+    (layer, row, col) of the boundary grid cells: it is stored sparsely as a `pycomus.CellList` and grid cells
+    that are not listed get 0.
+
     Attributes:
     ----------------------------
     model: pycomus.ComusModel
         The COMUS model to which the DRN package will be applied.
-    cond: Union[int, float, Dict[int, Union[int, float, np.ndarray]]]
+    cond: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple]]]
         The hydraulic conductivity coefficient between the drainage ditch and the aquifer at the grid cell (L²/T).
-    delev: Union[int, float, Dict[int, Union[int, float, np.ndarray]]]
+    delev: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple]]]
         The elevation of the bottom of the drainage ditch at the grid cell (L).
 
     Methods:
     --------
     __init__(self, model: pycomus.ComusModel,
-                 cond: Union[int, float, Dict[int, Union[int, float, np.ndarray]]],
-                 delev: Union[int, float, Dict[int, Union[int, float, np.ndarray]]])
+                 cond: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple]]],
+                 delev: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple]]])
         Initialize the COMUS Model with the Drainage(DRN) package.
 
     load(cls, model, drn_params_file: str)
@@ -56,8 +61,8 @@ class ComusDrn:
     """
 
     def __init__(self, model: pycomus.ComusModel,
-                 cond: Union[int, float, Dict[int, Union[int, float, np.ndarray]]],
-                 delev: Union[int, float, Dict[int, Union[int, float, np.ndarray]]]):
+                 cond: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple]]],
+                 delev: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple]]]):
         BoundaryCheck.check_bnd_queue(model)
         cms_dis = BoundaryCheck.get_cms_pars(model)
         cms_period = BoundaryCheck.get_period(model)
@@ -107,30 +112,9 @@ class ComusDrn:
         """
         BoundaryCheck.check_bnd_queue(model)
         cms_dis = BoundaryCheck.get_cms_pars(model)
-        num_lyr = cms_dis.num_lyr
-        num_row = cms_dis.num_row
-        num_col = cms_dis.num_col
-        with open(drn_params_file, 'r') as file:
-            lines = file.readlines()
-        if len(lines[0].strip().split()) != 6:
-            raise ValueError("The Drainage(DRN) Period Attribute file header should have 6 fields.")
-        if len(lines[1].strip().split()) != 6:
-            raise ValueError("The Drainage(DRN) Period Attribute file data line should have 6 values.")
-        lines = lines[1:]
-        delev = {}
-        cond = {}
-        for line in lines:
-            line = line.strip().split()
-            period = int(line[0]) - 1
-            lyr = int(line[1]) - 1
-            row = int(line[2]) - 1
-            col = int(line[3]) - 1
-            if period not in delev:
-                delev[period] = np.zeros((num_lyr, num_row, num_col))
-                cond[period] = np.zeros((num_lyr, num_row, num_col))
-            delev[period][lyr, row, col] = float(line[4])
-            cond[period][lyr, row, col] = float(line[5])
-        instance = cls(model, cond=cond, delev=delev)
+        shape = (cms_dis.num_lyr, cms_dis.num_row, cms_dis.num_col)
+        pars, _ = BoundaryIO.load_periods(drn_params_file, "Drainage(DRN)", 6, {"delev": 4, "cond": 5}, shape)
+        instance = cls(model, cond=pars["cond"], delev=pars["delev"])
         return instance
 
     def __str__(self):
@@ -153,33 +137,35 @@ class ComusDrn:
     def _write_file_test(self, folder_path: str) -> bool:
         flag = 0
         period_len = len(self._period)
+        shape = (self._num_lyr, self._num_row, self._num_col)
+        bots = self._model.grid_arrays.bot.reshape(-1)
         with open(os.path.join(folder_path, DRN_FILE_NAME), "w") as file:
             file.write("IPER  ILYR  IROW  ICOL  DELEV  COND\n")
             periods = sorted(self.cond.keys())
+            previous = None
             for period in periods:
                 if not BoundaryCheck.check_period(period, period_len):
                     return False
                 cond_value = self.cond[period]
                 delev_value = self.delev[period]
+                current = BoundaryCheck.period_digests(cond_value, delev_value)
+                if current == previous:
+                    continue
+                previous = current
                 if not BoundaryCheck.check_dict_zero(cond_value, "Cond", self._num_lyr, self._num_row, self._num_col):
                     return False
-                for layer in range(self._num_lyr):
-                    lyr_type: int = self._model.layers[layer].lyr_type
-                    for row in range(self._num_row):
-                        for col in range(self._num_col):
-                            if cond_value[layer, row, col] > 0:
-                                if lyr_type in (1, 3):
-                                    bot = self._model.layers[layer].grid_cells[row][col].bot
-                                    if delev_value[layer, row, col] < bot:
-                                        print(
-                                            f"DRN Package:The bottom elevation of the drainage ditch at grid cell ({layer},{row},{col})"
-                                            f" cannot be lower than the bottom elevation of the grid cell.")
-                                        return False
-                                file.write(
-                                    f"{period + 1}  {layer + 1}  {row + 1}  {col + 1}  {delev_value[layer, row, col]}  "
-                                    f"{cond_value[layer, row, col]}\n")
-                                if period == 0:
-                                    flag += 1
+                # Only the grid cells with a conductance are written, in layer, row, col order
+                index = BoundaryIO.select_cells(cond_value, where=lambda cond: cond > 0)
+                delev, cond = (cell_values(value, index) for value in (delev_value, cond_value))
+                convertible = BoundaryIO.convertible_cells(self._model, index, shape)
+                if not BoundaryIO.report_cells(convertible & (delev < bots[index]), index, shape,
+                                               "DRN Package:The bottom elevation of the drainage ditch at grid cells "
+                                               "{cells} cannot be lower than the bottom elevation of the grid cell."):
+                    return False
+                BoundaryIO.write_cell_rows(file, period, index, shape, [delev, cond],
+                                           float_format=self._model.float_format)
+                if period == 0:
+                    flag += index.size
                 if flag == 0 and period == 0:
                     file.write("1  1  1  1  1E+100  0\n")
         return True
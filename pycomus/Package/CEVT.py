@@ -11,8 +11,9 @@ from typing import Union, Dict
 import numpy as np
 
 import pycomus
-from pycomus.Utils import BoundaryCheck
+from pycomus.Utils import BoundaryCheck, BoundaryIO
 from pycomus.Utils.CONSTANTS import EVT_PKG_NAME, EVT_FILE_NAME
+from pycomus.Utils.CellList import cell_values
 
 
 class ComusEvt:
@@ -123,39 +124,11 @@ class ComusEvt:
         """
         BoundaryCheck.check_bnd_queue(model)
         cms_dis = BoundaryCheck.get_cms_pars(model)
-        num_lyr = cms_dis.num_lyr
-        num_row = cms_dis.num_row
-        num_col = cms_dis.num_col
-        with open(evt_params_file, 'r') as file:
-            lines = file.readlines()
-        if len(lines[0].strip().split()) != 10:
-            raise ValueError("The Evapotranspiration(EVT) Period Attribute file header should have 10 fields.")
-        data = lines[1].strip().split()
-        if len(data) != 10:
-            raise ValueError("The Evapotranspiration(EVT) Period Attribute file data line should have 10 values.")
-        lines = lines[1:]
-        evt = int(lines[0].strip().split()[4])
-        num_seg = int(lines[0].strip().split()[9])
-        et_surf = {}
-        et_rate = {}
-        et_mxd = {}
-        et_exp = {}
-        for line in lines:
-            line = line.strip().split()
-            period = int(line[0]) - 1
-            lyr = int(line[1]) - 1
-            row = int(line[2]) - 1
-            col = int(line[3]) - 1
-            if period not in et_surf:
-                et_surf[period] = np.zeros((num_lyr, num_row, num_col))
-                et_rate[period] = np.zeros((num_lyr, num_row, num_col))
-                et_mxd[period] = np.zeros((num_lyr, num_row, num_col))
-                et_exp[period] = np.zeros((num_lyr, num_row, num_col))
-            et_surf[period][lyr, row, col] = float(line[5])
-            et_rate[period][lyr, row, col] = float(line[6])
-            et_mxd[period][lyr, row, col] = float(line[7])
-            et_exp[period][lyr, row, col] = float(line[8])
-        instance = cls(model, et_surf=et_surf, et_rate=et_rate, et_mxd=et_mxd, et_exp=et_exp, evt=evt, num_seg=num_seg)
+        shape = (cms_dis.num_lyr, cms_dis.num_row, cms_dis.num_col)
+        pars, first_row = BoundaryIO.load_periods(evt_params_file, "Evapotranspiration(EVT)", 10,
+                                                  {"et_surf": 5, "et_rate": 6, "et_mxd": 7, "et_exp": 8}, shape)
+        instance = cls(model, et_surf=pars["et_surf"], et_rate=pars["et_rate"], et_mxd=pars["et_mxd"],
+                       et_exp=pars["et_exp"], evt=int(first_row[4]), num_seg=int(first_row[9]))
         return instance
 
     def __str__(self):
@@ -178,6 +151,7 @@ class ComusEvt:
     def _write_file_test(self, folder_path: str) -> bool:
         flag = 0
         period_len = len(self._period)
+        shape = (self._num_lyr, self._num_row, self._num_col)
         if self.evt not in [1, 2]:
             raise ValueError("IEvt should be 1 or 2.")
         if self.num_seg < 2 or self.num_seg > 20:
@@ -185,6 +159,7 @@ class ComusEvt:
         with open(os.path.join(folder_path, EVT_FILE_NAME), "w") as file:
             file.write("IPER  ILYR  IROW  ICOL  IEVT  ETSURF  ETRATE  ETMXD  ETEXP  NUMSEG\n")
             periods = sorted(self.et_surf.keys())
+            previous = None
             for period in periods:
                 if not BoundaryCheck.check_period(period, period_len):
                     return False
@@ -192,21 +167,25 @@ class ComusEvt:
                 ETRate_value = self.et_rate[period]
                 ETMxd_value = self.et_mxd[period]
                 ETExp_value = self.et_exp[period]
-                for layer in range(self._num_lyr):
-                    for row in range(self._num_row):
-                        for col in range(self._num_col):
-                            if ETExp_value[layer, row, col] > 0:
-                                if ETRate_value[layer, row, col] < 0 or ETMxd_value[layer, row, col] <= 0 or ETExp_value[
-                                    layer, row, col] <= 0:
-                                    print("Data anomaly in the ETRATE, ETMXD, or ETEXP fields. ETRATE must be >= 0.0, "
-                                          "ETMXD must be > 0.0, and ETEXP must be > 0.0!")
-                                    return False
-                                file.write(
-                                    f"{period + 1}  {layer + 1}  {row + 1}  {col + 1}  {self.evt}  {ETSurf_value[layer, row, col]}  "
-                                    f"{ETRate_value[layer, row, col]}  {ETMxd_value[layer, row, col]}  "
-                                    f"{ETExp_value[layer, row, col]}  {self.num_seg}\n")
-                                if period == 0:
-                                    flag += 1
+                current = BoundaryCheck.period_digests(ETSurf_value, ETRate_value, ETMxd_value, ETExp_value)
+                if current == previous:
+                    continue
+                previous = current
+                # Only the grid cells with an evaporation exponent are written, in layer, row, col order
+                index = BoundaryIO.select_cells(ETExp_value, where=lambda et_exp: et_exp > 0)
+                et_surf, et_rate, et_mxd, et_exp = (cell_values(value, index) for value in
+                                                    (ETSurf_value, ETRate_value, ETMxd_value, ETExp_value))
+                if not BoundaryIO.report_cells((et_rate < 0) | (et_mxd <= 0) | (et_exp <= 0), index, shape,
+                                               "Data anomaly in the ETRATE, ETMXD, or ETEXP fields. ETRATE must be "
+                                               ">= 0.0, ETMXD must be > 0.0, and ETEXP must be > 0.0! "
+                                               "Grid cells: {cells}"):
+                    return False
+                BoundaryIO.write_cell_rows(file, period, index, shape,
+                                           [np.full(index.size, self.evt), et_surf, et_rate, et_mxd, et_exp,
+                                            np.full(index.size, self.num_seg)],
+                                           float_format=self._model.float_format)
+                if period == 0:
+                    flag += index.size
                 if flag == 0 and period == 0:
                     file.write(f"1  1  1  1  {self.evt}  1E+100  0  1E+100  0  {self.num_seg}\n")
         return True
@@ -6,19 +6,24 @@
 # --------------------------------------------------------------
 import os
 import sys
-from typing import Union, Dict
+from typing import Union, Dict, Tuple
 
 import numpy as np
 
 import pycomus
-from pycomus.Utils import BoundaryCheck
+from pycomus.Utils import BoundaryCheck, BoundaryIO
 from pycomus.Utils.CONSTANTS import GHB_PKG_NAME, GHB_FILE_NAME
+from pycomus.Utils.CellList import cell_values
 
 
 class ComusGhb:
     """
     Initialize the COMUS Model with the General-Head Boundary(GHB) package.
 
+    The value of a stress period can also be given as a cell list `(cells, values)`, `cells` being the
+    (layer, row, col) of the boundary grid cells: it is stored sparsely as a `pycomus.CellList` and grid cells
+    that are not listed get 0.
+
     Attributes:
     ----------------------------
     model:
@@ -32,9 +37,9 @@ class ComusGhb:
 
     Methods:
     --------
-    __init__(self, model: pycomus.ComusModel, cond: Union[int, float, Dict[int, Union[int, float, np.ndarray]]],
-                 shead: Union[int, float, Dict[int, Union[int, float, np.ndarray]]],
-                 ehead: Union[int, float, Dict[int, Union[int, float, np.ndarray]]])
+    __init__(self, model: pycomus.ComusModel, cond: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple]]],
+                 shead: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple]]],
+                 ehead: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple]]])
         Initialize the COMUS Model with the General-Head Boundary(GHB) package.
 
     load(cls, model, ghb_params_file: str)
@@ -56,9 +61,9 @@ class ComusGhb:
     >>> ghbPkg = pycomus.ComusGhb(model1, cond={0: 1}, shead=1, ehead=2)
     """
 
-    def __init__(self, model: pycomus.ComusModel, cond: Union[int, float, Dict[int, Union[int, float, np.ndarray]]],
-                 shead: Union[int, float, Dict[int, Union[int, float, np.ndarray]]],
-                 ehead: Union[int, float, Dict[int, Union[int, float, np.ndarray]]]):
+    def __init__(self, model: pycomus.ComusModel, cond: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple]]],
+                 shead: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple]]],
+                 ehead: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple]]]):
         BoundaryCheck.check_bnd_queue(model)
         cms_dis = BoundaryCheck.get_cms_pars(model)
         cms_period = BoundaryCheck.get_period(model)
@@ -102,34 +107,10 @@ class ComusGhb:
         """
         BoundaryCheck.check_bnd_queue(model)
         cms_dis = BoundaryCheck.get_cms_pars(model)
-        num_lyr = cms_dis.num_lyr
-        num_row = cms_dis.num_row
-        num_col = cms_dis.num_col
-        with open(ghb_params_file, 'r') as file:
-            lines = file.readlines()
-        if len(lines[0].strip().split()) != 7:
-            raise ValueError("The General-Head Boundary(GHB) Period Attribute file header should have 7 fields.")
-        data = lines[1].strip().split()
-        if len(data) != 7:
-            raise ValueError("The General-Head Boundary(GHB) Period Attribute file data line should have 7 values.")
-        lines = lines[1:]
-        cond = {}
-        shead = {}
-        ehead = {}
-        for line in lines:
-            line = line.strip().split()
-            period = int(line[0]) - 1
-            lyr = int(line[1]) - 1
-            row = int(line[2]) - 1
-            col = int(line[3]) - 1
-            if period not in cond:
-                shead[period] = np.zeros((num_lyr, num_row, num_col))
-                ehead[period] = np.zeros((num_lyr, num_row, num_col))
-                cond[period] = np.zeros((num_lyr, num_row, num_col))
-            shead[period][lyr, row, col] = float(line[4])
-            ehead[period][lyr, row, col] = float(line[5])
-            cond[period][lyr, row, col] = float(line[6])
-        instance = cls(model, cond=cond, shead=shead, ehead=ehead)
+        shape = (cms_dis.num_lyr, cms_dis.num_row, cms_dis.num_col)
+        pars, _ = BoundaryIO.load_periods(ghb_params_file, "General-Head Boundary(GHB)", 7,
+                                          {"shead": 4, "ehead": 5, "cond": 6}, shape)
+        instance = cls(model, cond=pars["cond"], shead=pars["shead"], ehead=pars["ehead"])
         return instance
 
     def __str__(self):
@@ -152,33 +133,37 @@ class ComusGhb:
     def _write_file_test(self, folder_path: str) -> bool:
         flag = 0
         period_len = len(self._period)
+        shape = (self._num_lyr, self._num_row, self._num_col)
+        bots = self._model.grid_arrays.bot.reshape(-1)
         with open(os.path.join(folder_path, GHB_FILE_NAME), "w") as file:
             file.write("IPER  ILYR  IROW  ICOL  SHEAD  EHEAD  COND\n")
             periods = sorted(self.cond.keys())
+            previous = None
             for period in periods:
                 if not BoundaryCheck.check_period(period, period_len):
                     return False
                 cond_value = self.cond[period]
                 shead_value = self.shead[period]
                 ehead_value = self.ehead[period]
+                current = BoundaryCheck.period_digests(cond_value, shead_value, ehead_value)
+                if current == previous:
+                    continue
+                previous = current
                 if not BoundaryCheck.check_dict_zero(cond_value, "Cond", self._num_lyr, self._num_row, self._num_col):
                     return False
-                for layer in range(self._num_lyr):
-                    lyr_type: int = self._model.layers[layer].lyr_type
-                    for row in range(self._num_row):
-                        for col in range(self._num_col):
-                            if cond_value[layer, row, col] > 0:
-                                if lyr_type in (1, 3):
-                                    bot = self._model.layers[layer].grid_cells[row][col].bot
-                                    if shead_value[layer, row, col] <= bot or ehead_value[layer, row, col] <= bot:
-                                        print(f"The hydraulic head at grid cell ({layer},{row},{col}) cannot be lower "
-                                              f"than or equal to the bottom elevation of the grid cell.")
-                                        return False
-                                file.write(
-                                    f"{period + 1}  {layer + 1}  {row + 1}  {col + 1}  {shead_value[layer, row, col]}  "
-                                    f"{ehead_value[layer, row, col]}  {cond_value[layer, row, col]}\n")
-                                if period == 0:
-                                    flag += 1
+                # Only the grid cells with a conductance are written, in layer, row, col order
+                index = BoundaryIO.select_cells(cond_value, where=lambda cond: cond > 0)
+                shead, ehead, cond = (cell_values(value, index) for value in (shead_value, ehead_value, cond_value))
+                bot = bots[index]
+                convertible = BoundaryIO.convertible_cells(self._model, index, shape)
+                if not BoundaryIO.report_cells(convertible & ((shead <= bot) | (ehead <= bot)), index, shape,
+                                               "The hydraulic head at grid cells {cells} cannot be lower than or "
+                                               "equal to the bottom elevation of the grid cell."):
+                    return False
+                BoundaryIO.write_cell_rows(file, period, index, shape, [shead, ehead, cond],
+                                           float_format=self._model.float_format)
+                if period == 0:
+                    flag += index.size
                 if flag == 0 and period == 0:
                     file.write("1  1  1  1  0  1E+100  1E+100\n")
         return True
@@ -12,6 +12,7 @@ import numpy as np
 import pycomus
 from pycomus.Utils import BoundaryCheck
 from pycomus.Utils.CONSTANTS import IBS_PKG_NAME, IBS_FILE_NAME
+from pycomus.Utils.TextTable import write_table
 
 
 class ComusIbs:
@@ -140,10 +141,7 @@ class ComusIbs:
         """
         with open(os.path.join(folder_path, IBS_FILE_NAME), "w") as file:
             file.write("ILYR  IROW  ICOL  HC  SFE  SFV  COM\n")
-            for layer in range(self._num_lyr):
-                for row in range(self._num_row):
-                    for col in range(self._num_col):
-                        if self.sfe[layer, row, col] > 0 and self.sfv[layer, row, col] > 0:
-                            file.write(
-                                f"{layer + 1}  {row + 1}  {col + 1}  {self.hc[layer, row, col]}  "
-                                f"{self.sfe[layer, row, col]}  {self.sfv[layer, row, col]}  {self.com[layer, row, col]}\n")
+            index = np.flatnonzero((self.sfe > 0) & (self.sfv > 0))
+            cells = [axis + 1 for axis in np.unravel_index(index, self.sfe.shape)]
+            write_table(file, cells + [value.reshape(-1)[index] for value in (self.hc, self.sfe, self.sfv, self.com)],
+                        float_format=self._model.float_format)
@@ -11,8 +11,9 @@ from typing import Union, Dict
 import numpy as np
 
 import pycomus
-from pycomus.Utils import BoundaryCheck
+from pycomus.Utils import BoundaryCheck, BoundaryIO
 from pycomus.Utils.CONSTANTS import RCH_PKG_NAME, RCH_FILE_NAME
+from pycomus.Utils.CellList import cell_values
 
 
 class ComusRch:
@@ -64,6 +65,7 @@ class ComusRch:
         self._num_row = cms_dis.num_row
         self._num_col = cms_dis.num_col
         self._period = cms_period.period
+        self._model = model
         self.rech = rech
         if self.rech not in [1, 2]:
             raise ValueError("rech should be 1 or 2.")
@@ -96,32 +98,9 @@ class ComusRch:
         """
         BoundaryCheck.check_bnd_queue(model)
         cms_dis = BoundaryCheck.get_cms_pars(model)
-        num_lyr = cms_dis.num_lyr
-        num_row = cms_dis.num_row
-        num_col = cms_dis.num_col
-        with open(rch_params_file, 'r') as file:
-            lines = file.readlines()
-        if len(lines[0].strip().split()) != 6:
-            raise ValueError("The Recharge(RCH) Period Attribute file header should have 6 fields.")
-        data = lines[1].strip().split()
-        if len(data) != 6:
-            raise ValueError("The Recharge(RCH) Period Attribute file data line should have 6 values.")
-        lines = lines[1:]
-        rech = int(lines[0].strip().split()[4])
-
-        recharge = {}
-        for line in lines:
-            line = line.strip().split()
-            period = int(line[0]) - 1
-            lyr = int(line[1]) - 1
-            row = int(line[2]) - 1
-            col = int(line[3]) - 1
-            if period not in recharge:
-                recharge[period] = np.zeros((num_lyr, num_row, num_col))
-                recharge[period][lyr, row, col] = float(line[5])
-            else:
-                recharge[period][lyr, row, col] = float(line[5])
-        instance = cls(model, rech=rech, rechr=recharge)
+        shape = (cms_dis.num_lyr, cms_dis.num_row, cms_dis.num_col)
+        pars, first_row = BoundaryIO.load_periods(rch_params_file, "Recharge(RCH)", 6, {"rechr": 5}, shape)
+        instance = cls(model, rech=int(first_row[4]), rechr=pars["rechr"])
         return instance
 
     def __str__(self):
@@ -144,23 +123,28 @@ class ComusRch:
     def _write_file_test(self, folder_path: str) -> bool:
         flag = 0
         period_len = len(self._period)
+        shape = (self._num_lyr, self._num_row, self._num_col)
         with open(os.path.join(folder_path, RCH_FILE_NAME), "w") as file:
             file.write("IPER  ILYR  IROW  ICOL  IRECH  RECHR\n")
             periods = sorted(self.rechr.keys())
+            previous = None
             for period in periods:
                 if not BoundaryCheck.check_period(period, period_len):
                     return False
                 rechr_value = self.rechr[period]
+                current = BoundaryCheck.period_digests(rechr_value)
+                if current == previous:
+                    continue
+                previous = current
                 if not BoundaryCheck.check_dict_zero(rechr_value, "Rechr", self._num_lyr, self._num_row, self._num_col):
                     return False
-                for layer in range(self._num_lyr):
-                    for row in range(self._num_row):
-                        for col in range(self._num_col):
-                            if rechr_value[layer, row, col] > 0:
-                                file.write(
-                                    f"{period + 1}  {layer + 1}  {row + 1}  {col + 1}  {self.rech}  {rechr_value[layer, row, col]} \n")
-                                if period == 0:
-                                    flag += 1
+                # Only the grid cells with recharge are written, in layer, row, col order
+                index = BoundaryIO.select_cells(rechr_value, where=lambda rechr: rechr > 0)
+                BoundaryIO.write_cell_rows(file, period, index, shape,
+                                           [np.full(index.size, self.rech), cell_values(rechr_value, index)],
+                                           end=" \n", float_format=self._model.float_format)
+                if period == 0:
+                    flag += index.size
                 if flag == 0 and period == 0:
                     file.write(f"1  1  1  1  {self.rech}  0\n")
         return True
@@ -6,19 +6,24 @@
 # --------------------------------------------------------------
 import os
 import sys
-from typing import Union, Dict
+from typing import Union, Dict, Tuple
 
 import numpy as np
 
 import pycomus
-from pycomus.Utils import BoundaryCheck
+from pycomus.Utils import BoundaryCheck, BoundaryIO
 from pycomus.Utils.CONSTANTS import RIV_PKG_NAME, RIV_FILE_NAME
+from pycomus.Utils.CellList import cell_values
 
 
 class ComusRiv:
     """
     Initialize the COMUS Model with the River(RIV) package.
 
+    The value of a stress period can also be given as a cell list `(cells, values)`, `cells` being the
+    (layer, row, col) of the boundary grid cells: it is stored sparsely as a `pycomus.CellList` and grid cells
+    that are not listed get 0.
+
     Attributes:
     ----------------------------
     model:
@@ -34,10 +39,10 @@ class ComusRiv:
 
     Methods:
     --------
-    __init__(self, model: pycomus.ComusModel, cond: Union[int, float, Dict[int, Union[int, float, np.ndarray]]],
-                 shead: Union[int, float, Dict[int, Union[int, float, np.ndarray]]],
-                 ehead: Union[int, float, Dict[int, Union[int, float, np.ndarray]]],
-                 riv_btm: Union[int, float, Dict[int, Union[int, float, np.ndarray]]])
+    __init__(self, model: pycomus.ComusModel, cond: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple]]],
+                 shead: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple]]],
+                 ehead: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple]]],
+                 riv_btm: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple]]])
         Initialize the COMUS Model with the River(RIV) package.
 
     load(cls, model, riv_params_file: str)
@@ -59,10 +64,10 @@ class ComusRiv:
     >>> rivPackage = pycomus.ComusRiv(model1, cond=1, shead=1, ehead=2, riv_btm=10)
     """
 
-    def __init__(self, model: pycomus.ComusModel, cond: Union[int, float, Dict[int, Union[int, float, np.ndarray]]],
-                 shead: Union[int, float, Dict[int, Union[int, float, np.ndarray]]],
-                 ehead: Union[int, float, Dict[int, Union[int, float, np.ndarray]]],
-                 riv_btm: Union[int, float, Dict[int, Union[int, float, np.ndarray]]]):
+    def __init__(self, model: pycomus.ComusModel, cond: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple]]],
+                 shead: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple]]],
+                 ehead: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple]]],
+                 riv_btm: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple]]]):
         BoundaryCheck.check_bnd_queue(model)
         cms_dis = BoundaryCheck.get_cms_pars(model)
         cms_period = BoundaryCheck.get_period(model)
@@ -111,37 +116,10 @@ class ComusRiv:
         """
         BoundaryCheck.check_bnd_queue(model)
         cms_dis = BoundaryCheck.get_cms_pars(model)
-        num_lyr = cms_dis.num_lyr
-        num_row = cms_dis.num_row
-        num_col = cms_dis.num_col
-        with open(riv_params_file, 'r') as file:
-            lines = file.readlines()
-        if len(lines[0].strip().split()) != 8:
-            raise ValueError("The River(RIV) Period Attribute file header should have 8 fields.")
-        data = lines[1].strip().split()
-        if len(data) != 8:
-            raise ValueError("The River(RIV) Period Attribute file data line should have 8 values.")
-        lines = lines[1:]
-        cond = {}
-        shead = {}
-        ehead = {}
-        riv_btm = {}
-        for line in lines:
-            line = line.strip().split()
-            period = int(line[0]) - 1
-            lyr = int(line[1]) - 1
-            row = int(line[2]) - 1
-            col = int(line[3]) - 1
-            if period not in cond:
-                shead[period] = np.zeros((num_lyr, num_row, num_col))
-                ehead[period] = np.zeros((num_lyr, num_row, num_col))
-                cond[period] = np.zeros((num_lyr, num_row, num_col))
-                riv_btm[period] = np.zeros((num_lyr, num_row, num_col))
-            shead[period][lyr, row, col] = float(line[4])
-            ehead[period][lyr, row, col] = float(line[5])
-            cond[period][lyr, row, col] = float(line[6])
-            riv_btm[period][lyr, row, col] = float(line[7])
-        instance = cls(model, cond=cond, shead=shead, ehead=ehead, riv_btm=riv_btm)
+        shape = (cms_dis.num_lyr, cms_dis.num_row, cms_dis.num_col)
+        pars, _ = BoundaryIO.load_periods(riv_params_file, "River(RIV)", 8,
+                                          {"shead": 4, "ehead": 5, "cond": 6, "riv_btm": 7}, shape)
+        instance = cls(model, cond=pars["cond"], shead=pars["shead"], ehead=pars["ehead"], riv_btm=pars["riv_btm"])
         return instance
 
     def __str__(self):
@@ -164,11 +142,14 @@ class ComusRiv:
     def _write_file_test(self, folder_path: str) -> bool:
         flag = 0
         period_len = len(self._period)
+        shape = (self._num_lyr, self._num_row, self._num_col)
+        bots = self._model.grid_arrays.bot.reshape(-1)
         with open(os.path.join(folder_path, RIV_FILE_NAME), "w") as file:
             file.write("IPER  ILYR  IROW  ICOL  SHEAD  EHEAD  COND  RIVBTM\n")
             periods = sorted(self.cond.keys())
             if periods[0] != 0:
                 file.write(f"1  1  1  1  1E+100  1E+100  0  1E+100\n")
+            previous = None
             for period in periods:
                 if not BoundaryCheck.check_period(period, period_len):
                     return False
@@ -176,31 +157,31 @@ class ComusRiv:
                 shead_value = self.shead[period]
                 ehead_value = self.ehead[period]
                 rivBtm_value = self.riv_btm[period]
+                current = BoundaryCheck.period_digests(cond_value, shead_value, ehead_value, rivBtm_value)
+                if current == previous:
+                    continue
+                previous = current
                 if not BoundaryCheck.check_dict_zero(cond_value, "Cond", self._num_lyr, self._num_row, self._num_col):
                     return False
-                for layer in range(self._num_lyr):
-                    lyr_type: int = self._model.layers[layer].lyr_type
-                    for row in range(self._num_row):
-                        for col in range(self._num_col):
-                            if cond_value[layer, row, col] > 0:
-                                if lyr_type in (1, 3):
-                                    bot = self._model.layers[layer].grid_cells[row][col].bot
-                                    if shead_value[layer, row, col] <= bot or ehead_value[layer, row, col] <= bot:
-                                        print(layer, row, col)
-                                        print(shead_value[layer, row, col], ehead_value[layer, row, col], bot)
-                                        print(f"The river stage at grid cell ({layer},{row},{col}) cannot be lower "
-                                              f"than or equal to the bottom elevation of the grid cell.")
-                                        return False
-                                if shead_value[layer, row, col] <= rivBtm_value[layer, row, col] or \
-                                        ehead_value[layer, row, col] <= rivBtm_value[layer, row, col]:
-                                    print("The initial and final river stages must be higher than the bottom elevation "
-                                          "of their low-permeability material in the period!")
-                                    return False
-                                file.write(
-                                    f"{period + 1}  {layer + 1}  {row + 1}  {col + 1}  {shead_value[layer, row, col]}  "
-                                    f"{ehead_value[layer, row, col]}  {cond_value[layer, row, col]}  {rivBtm_value[layer, row, col]}\n")
-                                if period == 0:
-                                    flag += 1
+                # Only the grid cells with a river conductance are written, in layer, row, col order
+                index = BoundaryIO.select_cells(cond_value, where=lambda cond: cond > 0)
+                shead, ehead, cond, riv_btm = (cell_values(value, index) for value in
+                                               (shead_value, ehead_value, cond_value, rivBtm_value))
+                bot = bots[index]
+                convertible = BoundaryIO.convertible_cells(self._model, index, shape)
+                if not BoundaryIO.report_cells(convertible & ((shead <= bot) | (ehead <= bot)), index, shape,
+                                               "The river stage at grid cells {cells} cannot be lower than or equal "
+                                               "to the bottom elevation of the grid cell."):
+                    return False
+                if not BoundaryIO.report_cells((shead <= riv_btm) | (ehead <= riv_btm), index, shape,
+                                               "The initial and final river stages must be higher than the bottom "
+                                               "elevation of their low-permeability material in the period! "
+                                               "Grid cells: {cells}"):
+                    return False
+                BoundaryIO.write_cell_rows(file, period, index, shape, [shead, ehead, cond, riv_btm],
+                                           float_format=self._model.float_format)
+                if period == 0:
+                    flag += index.size
                 if flag == 0 and period == 0:
                     file.write("1  1  1  1  0  1E+100  1E+100\n")
         return True
@@ -6,19 +6,24 @@
 # --------------------------------------------------------------
 import os
 import sys
-from typing import Union, Dict
+from typing import Union, Dict, Tuple
 
 import numpy as np
 
 import pycomus
-from pycomus.Utils import BoundaryCheck
+from pycomus.Utils import BoundaryCheck, BoundaryIO
 from pycomus.Utils.CONSTANTS import SHB_PKG_NAME, SHB_FILE_NAME
+from pycomus.Utils.CellList import cell_values
 
 
 class ComusShb:
     """
     Initialize the COMUS Model with the Transient Specified-Head Boundary(SHB) package.
 
+    The value of a stress period can also be given as a cell list `(cells, values)`, `cells` being the
+    (layer, row, col) of the boundary grid cells: it is stored sparsely as a `pycomus.CellList` and grid cells
+    that are not listed get 0.
+
     Parameters:
     ----------------------------
     model:
@@ -30,8 +35,8 @@ class ComusShb:
 
     Methods:
     --------
-    __init__(self, model: pycomus.ComusModel, shead: Union[int, float, Dict[int, Union[int, float, np.ndarray]]],
-                 ehead: Union[int, float, Dict[int, Union[int, float, np.ndarray]]])
+    __init__(self, model: pycomus.ComusModel, shead: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple]]],
+                 ehead: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple]]])
         Initialize the COMUS Model with the Transient Specified-Head Boundary(SHB) package.
 
     load(cls, model, shb_params_file: str)
@@ -53,8 +58,8 @@ class ComusShb:
     >>> shbPackage = pycomus.ComusShb(model1, shead=1, ehead=2)
     """
 
-    def __init__(self, model: pycomus.ComusModel, shead: Union[int, float, Dict[int, Union[int, float, np.ndarray]]],
-                 ehead: Union[int, float, Dict[int, Union[int, float, np.ndarray]]]):
+    def __init__(self, model: pycomus.ComusModel, shead: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple]]],
+                 ehead: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple]]]):
         BoundaryCheck.check_bnd_queue(model)
         cms_dis = BoundaryCheck.get_cms_pars(model)
         cms_period = BoundaryCheck.get_period(model)
@@ -96,33 +101,10 @@ class ComusShb:
         """
         BoundaryCheck.check_bnd_queue(model)
         cms_dis = BoundaryCheck.get_cms_pars(model)
-        num_lyr = cms_dis.num_lyr
-        num_row = cms_dis.num_row
-        num_col = cms_dis.num_col
-        with open(shb_params_file, 'r') as file:
-            lines = file.readlines()
-        if len(lines[0].strip().split()) != 6:
-            raise ValueError(
-                "The Transient Specified-Head Boundary(SHB) Period Attribute file header should have 6 fields.")
-        data = lines[1].strip().split()
-        if len(data) != 6:
-            raise ValueError(
-                "The Transient Specified-Head Boundary(SHB) Period Attribute file data line should have 6 values.")
-        lines = lines[1:]
-        shead = {}
-        ehead = {}
-        for line in lines:
-            line = line.strip().split()
-            period = int(line[0]) - 1
-            lyr = int(line[1]) - 1
-            row = int(line[2]) - 1
-            col = int(line[3]) - 1
-            if period not in shead:
-                shead[period] = np.zeros((num_lyr, num_row, num_col))
-                ehead[period] = np.zeros((num_lyr, num_row, num_col))
-            shead[period][lyr, row, col] = float(line[4])
-            ehead[period][lyr, row, col] = float(line[5])
-        instance = cls(model, shead=shead, ehead=ehead)
+        shape = (cms_dis.num_lyr, cms_dis.num_row, cms_dis.num_col)
+        pars, _ = BoundaryIO.load_periods(shb_params_file, "Transient Specified-Head Boundary(SHB)", 6,
+                                          {"shead": 4, "ehead": 5}, shape)
+        instance = cls(model, shead=pars["shead"], ehead=pars["ehead"])
         return instance
 
     def __str__(self):
@@ -144,25 +126,30 @@ class ComusShb:
 
     def _write_file_test(self, folder_path: str) -> bool:
         period_len = len(self._period)
+        shape = (self._num_lyr, self._num_row, self._num_col)
+        ibounds = self._model.grid_arrays.ibound.reshape(-1)
         with open(os.path.join(folder_path, SHB_FILE_NAME), "w") as file:
             file.write("IPER  ILYR  IROW  ICOL  SHEAD  EHEAD\n")
             periods = sorted(self.shead.keys())
+            previous = None
             for period in periods:
                 if not BoundaryCheck.check_period(period, period_len):
                     return False
                 shead_value = self.shead[period]
                 ehead_value = self.ehead[period]
-                for layer in range(self._num_lyr):
-                    for row in range(self._num_row):
-                        for col in range(self._num_col):
-                            if shead_value[layer, row, col] != 0 and ehead_value[layer, row, col] != 0:
-                                ibound = self._model.layers[layer].grid_cells[row][col].ibound
-                                if ibound <= 0:
-                                    print(
-                                        f"DRN Package:The grid cell with the ID ({layer},{row},{col}) is initialized as an "
-                                        f"invalid cell or a steady-state head cell. It cannot be set as an SHB cell during the %dth stress period.")
-                                    return False
-                                file.write(
-                                    f"{period + 1}  {layer + 1}  {row + 1}  {col + 1}  {shead_value[layer, row, col]}  "
-                                    f"{ehead_value[layer, row, col]}\n")
+                current = BoundaryCheck.period_digests(shead_value, ehead_value)
+                if current == previous:
+                    continue
+                previous = current
+                # Only the grid cells with both heads set are written, in layer, row, col order
+                index = BoundaryIO.select_cells(shead_value, ehead_value,
+                                                where=lambda shead, ehead: (shead != 0) & (ehead != 0))
+                if not BoundaryIO.report_cells(ibounds[index] <= 0, index, shape,
+                                               "SHB Package:The grid cells with the ID {cells} are initialized as "
+                                               "invalid cells or steady-state head cells. They cannot be set as SHB "
+                                               f"cells during the {period + 1}th stress period."):
+                    return False
+                BoundaryIO.write_cell_rows(file, period, index, shape,
+                                           [cell_values(shead_value, index), cell_values(ehead_value, index)],
+                                           float_format=self._model.float_format)
         return True
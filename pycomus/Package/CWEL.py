@@ -6,19 +6,24 @@
 # --------------------------------------------------------------
 import os
 import sys
-from typing import Union, Dict
+from typing import Union, Dict, Tuple
 
 import numpy as np
 
 import pycomus
-from pycomus.Utils import BoundaryCheck
+from pycomus.Utils import BoundaryCheck, BoundaryIO
 from pycomus.Utils.CONSTANTS import WEL_PKG_NAME, WEL_FILE_NAME
+from pycomus.Utils.CellList import cell_values
 
 
 class ComusWel:
     """
     Initialize the COMUS Model with the Well(WEL) package.
 
+    The value of a stress period can also be given as a cell list `(cells, values)`, `cells` being the
+    (layer, row, col) of the boundary grid cells: it is stored sparsely as a `pycomus.CellList` and grid cells
+    that are not listed get 0.
+
     Attributes:
     ----------------------------
     model:
@@ -30,8 +35,8 @@ class ComusWel:
 
     Methods:
     --------
-    __init__(self, model: pycomus.ComusModel, wellr: Union[int, float, Dict[int, Union[int, float, np.ndarray]]],
-                 satthr: Union[int, float, Dict[int, Union[int, float, np.ndarray]]])
+    __init__(self, model: pycomus.ComusModel, wellr: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple]]],
+                 satthr: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple]]])
         Initialize the COMUS Model with the Well(WEL) package.
 
     load(cls, model, wel_params_file: str)
@@ -52,10 +57,11 @@ class ComusWel:
     >>> import pycomus
     >>> model1 = pycomus.ComusModel(model_name="test")
     >>> welPackage = pycomus.ComusWel(model1, wellr={0: 1}, satthr=1)
+    >>> welPackage = pycomus.ComusWel(model1, wellr={0: ([(0, 3, 12), (1, 5, 7)], [-500, -250])}, satthr=1)
     """
 
-    def __init__(self, model: pycomus.ComusModel, wellr: Union[int, float, Dict[int, Union[int, float, np.ndarray]]],
-                 satthr: Union[int, float, Dict[int, Union[int, float, np.ndarray]]]):
+    def __init__(self, model: pycomus.ComusModel, wellr: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple]]],
+                 satthr: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple]]]):
         BoundaryCheck.check_bnd_queue(model)
         cms_dis = BoundaryCheck.get_cms_pars(model)
         cms_period = BoundaryCheck.get_period(model)
@@ -97,36 +103,9 @@ class ComusWel:
         """
         BoundaryCheck.check_bnd_queue(model)
         cms_dis = BoundaryCheck.get_cms_pars(model)
-        num_lyr = cms_dis.num_lyr
-        num_row = cms_dis.num_row
-        num_col = cms_dis.num_col
-        with open(wel_params_file, 'r') as file:
-            lines = file.readlines()
-        if len(lines[0].strip().split()) != 6:
-            raise ValueError(
-                "The Well(WEL) Period Attribute file header should have 6 fields.")
-        data = lines[1].strip().split()
-        if len(data) != 6:
-            raise ValueError(
-                "The Well(WEL) Period Attribute file data line should have 6 values.")
-        lines = lines[1:]
-        wellr = {}
-        satthr = {}
-        for line in lines:
-            line = line.strip().split()
-            period = int(line[0]) - 1
-            lyr = int(line[1]) - 1
-            row = int(line[2]) - 1
-            col = int(line[3]) - 1
-            if period not in wellr:
-                wellr[period] = np.zeros((num_lyr, num_row, num_col))
-                wellr[period][lyr, row, col] = float(line[4])
-                satthr[period] = np.zeros((num_lyr, num_row, num_col))
-                satthr[period][lyr, row, col] = float(line[5])
-            else:
-                wellr[period][lyr, row, col] = float(line[4])
-                satthr[period][lyr, row, col] = float(line[5])
-        instance = cls(model, wellr=wellr, satthr=satthr)
+        shape = (cms_dis.num_lyr, cms_dis.num_row, cms_dis.num_col)
+        pars, _ = BoundaryIO.load_periods(wel_params_file, "Well(WEL)", 6, {"wellr": 4, "satthr": 5}, shape)
+        instance = cls(model, wellr=pars["wellr"], satthr=pars["satthr"])
         return instance
 
     def __str__(self):
@@ -149,6 +128,7 @@ class ComusWel:
     def _write_file_test(self, folder_path: str) -> bool:
         flag = 0
         period_len = len(self._period)
+        shape = (self._num_lyr, self._num_row, self._num_col)
         sim_dry_wet: bool = False
         con_pars = BoundaryCheck.get_con_pars(self._model)
         wd_flg = con_pars.wd_flg
@@ -158,27 +138,30 @@ class ComusWel:
         with open(os.path.join(folder_path, WEL_FILE_NAME), "w") as file:
             file.write("IPER  ILYR  IROW  ICOL  WELLR  SATTHR\n")
             periods = sorted(self.wellr.keys())
+            previous = None
             for period in periods:
                 if not BoundaryCheck.check_period(period, period_len):
                     return False
                 wellr_value = self.wellr[period]
                 satthr_value = self.satthr[period]
-                for layer in range(self._num_lyr):
-                    lyr_type: int = self._model.layers[layer].lyr_type
-                    for row in range(self._num_row):
-                        for col in range(self._num_col):
-                            if sim_dry_wet and wellr_value[layer, row, col] < 0:
-                                if lyr_type in (1, 3):
-                                    if satthr_value[layer, row, col] <= 0:
-                                        raise ValueError(
-                                            f"The model has selected to simulate the dry-wet conversion of "
-                                            f"grid cells. Satthr for grid cell ({layer},{row},{col}) cannot "
-                                            f"be less than or equal to 0.0.")
-                            file.write(
-                                f"{period + 1}  {layer + 1}  {row + 1}  {col + 1}  {wellr_value[layer, row, col]}  "
-                                f"{satthr_value[layer, row, col]}\n")
-                            if period == 0:
-                                flag += 1
+                current = BoundaryCheck.period_digests(wellr_value, satthr_value)
+                if current == previous:
+                    continue
+                previous = current
+                # Dense periods write every grid cell, cell list periods only the listed cells
+                index = BoundaryIO.select_cells(wellr_value)
+                wellr, satthr = (cell_values(value, index) for value in (wellr_value, satthr_value))
+                if sim_dry_wet:
+                    invalid = BoundaryIO.convertible_cells(self._model, index, shape) & (wellr < 0) & (satthr <= 0)
+                    if np.any(invalid):
+                        raise ValueError(
+                            f"The model has selected to simulate the dry-wet conversion of grid cells. Satthr for "
+                            f"grid cells {BoundaryIO.format_cells(index[invalid], shape)} cannot be less than or "
+                            f"equal to 0.0.")
+                BoundaryIO.write_cell_rows(file, period, index, shape, [wellr, satthr],
+                                           float_format=self._model.float_format)
+                if period == 0:
+                    flag += index.size
             if flag == 0 and period == 0:
                 file.write(f"1  1  1  1  0  0\n")
         return True
@@ -1,11 +1,27 @@
-from typing import Union, Dict, List
+import hashlib
+from typing import Union, Dict, List, Tuple
 
 import numpy as np
 
 from pycomus.Utils import CONSTANTS
+from pycomus.Utils.CellList import CellList
 
 
-def CheckValueFormat(Value: Union[int, float, Dict[int, Union[int, float, np.ndarray]]],
+def to_cell_list(Value: Union[CellList, Tuple], ValueName: str, num_lyr: int, num_row: int,
+                 num_col: int) -> CellList:
+    if isinstance(Value, CellList):
+        if Value.shape != (num_lyr, num_row, num_col):
+            raise ValueError(f"Invalid shape of the {ValueName} cell list(need {num_lyr},{num_row},{num_col}).")
+        return Value
+    if len(Value) != 2:
+        raise ValueError(f"{ValueName} cell list should be given as (cells, values).")
+    try:
+        return CellList(Value[0], Value[1], (num_lyr, num_row, num_col))
+    except ValueError as e:
+        raise ValueError(f"Invalid {ValueName} cell list: {e}")
+
+
+def CheckValueFormat(Value: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple, CellList]]],
                      ValueName: str, period: List, num_lyr: int, num_row: int, num_col: int) -> Dict:
     res = {}
     if isinstance(Value, (float, int)):
@@ -33,15 +49,18 @@ def CheckValueFormat(Value: Union[int, float, Dict[int, Union[int, float, np.nda
                     res[key] = value
                 else:
                     raise ValueError(f"Invalid shape or values in the {ValueName} numpy array.")
+            elif isinstance(value, (tuple, CellList)):
+                res[key] = to_cell_list(value, ValueName, num_lyr, num_row, num_col)
             else:
                 raise ValueError(
-                    "Invalid value type in the dictionary. Values should be int, float, or numpy.ndarray.")
+                    "Invalid value type in the dictionary. Values should be int, float, numpy.ndarray or "
+                    "(cells, values).")
         return res
     else:
         raise ValueError(f"Invalid value type for '{ValueName}'. It should be int, float, or a dictionary.")
 
 
-def CheckValueGtZero(Value: Union[int, float, Dict[int, Union[int, float, np.ndarray]]],
+def CheckValueGtZero(Value: Union[int, float, Dict[int, Union[int, float, np.ndarray, Tuple, CellList]]],
                      ValueName: str, period: List, num_lyr: int, num_row: int, num_col: int) -> Dict:
     res = {}
     if isinstance(Value, (float, int)):
@@ -72,14 +91,43 @@ def CheckValueGtZero(Value: Union[int, float, Dict[int, Union[int, float, np.nda
                     res[key] = value
                 else:
                     raise ValueError(f"Invalid shape or values in the {ValueName} numpy array.")
+            elif isinstance(value, (tuple, CellList)):
+                cell_list = to_cell_list(value, ValueName, num_lyr, num_row, num_col)
+                if np.any(cell_list.values < 0):
+                    raise ValueError(f"{ValueName} value must be greater than or equal to 0.")
+                res[key] = cell_list
             else:
                 raise ValueError(
-                    "Invalid value type in the dictionary. Values should be int, float, or numpy.ndarray.")
+                    "Invalid value type in the dictionary. Values should be int, float, numpy.ndarray or "
+                    "(cells, values).")
         return res
     else:
         raise ValueError(f"Invalid value type for '{ValueName}'. It should be int, float, or a dictionary.")
 
 
+def period_digest(Value: Union[np.ndarray, CellList]) -> bytes:
+    """
+    Content hash of the value of a stress period, equal values of the same type, dtype and shape hash equally.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    arrays = (Value.index, Value.values) if isinstance(Value, CellList) else (Value,)
+    digest.update(type(Value).__name__.encode())
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        digest.update(array.reshape(-1).view(np.uint8))
+    return digest.digest()
+
+
+def period_digests(*Values: Union[np.ndarray, CellList]) -> Tuple[bytes, ...]:
+    """
+    Content hash of every value of a stress period. COMUS keeps using the data of the previous period for a period
+    missing from a boundary file, so a period with the same hashes as the previously written period is not written
+    again.
+    """
+    return tuple(period_digest(value) for value in Values)
+
+
 def Check3DValueExistGrid(Value: Union[int, float, np.ndarray], ValueName: str, num_lyr: int, num_row: int,
                           num_col: int, OriginValueList: List) -> np.ndarray:
     if isinstance(Value, (int, float)):
@@ -191,10 +239,14 @@ def check_col(tar_col: int, col: int) -> bool:
     return True
 
 
-def check_dict_zero(Value: np.ndarray, ValueName: str, num_lyr: int, num_row: int,
+def check_dict_zero(Value: Union[np.ndarray, CellList], ValueName: str, num_lyr: int, num_row: int,
                     num_col: int):
     if Value.shape == (num_lyr, num_row, num_col):
-        if (Value < 0).all():
+        if isinstance(Value, CellList):
+            if np.any(Value.values < 0):
+                print(f"{ValueName} value must be greater than or equal to 0.")
+                return False
+        elif (Value < 0).all():
             print(f"{ValueName} value must be greater than or equal to 0.")
             return False
     else:
@@ -0,0 +1,156 @@
+# --------------------------------------------------------------
+# BoundaryIO.py
+# Version: 1.0.0
+# Author: Zhenjiang Wu
+# Description: Vectorized Validation, Writing And Loading Of Cell Based Boundary Periods.
+# --------------------------------------------------------------
+import warnings
+from typing import Callable, Dict, List, TextIO, Tuple, Union
+
+import numpy as np
+
+from pycomus.Utils.CellList import CellList, cell_values, listed_index
+from pycomus.Utils.TextTable import CHUNK_ROWS, write_table
+
+
+def select_cells(*values: Union[np.ndarray, CellList],
+                 where: Union[Callable[..., np.ndarray], None] = None) -> np.ndarray:
+    """
+    Flat index, in layer, row, col order, of the active grid cells of a stress period.
+
+    The candidate cells are those that can hold a nonzero value in every one of `values` (see `listed_index`),
+    `where` receives the values of the candidates as 1D arrays, in the order of `values`, and returns the mask of
+    the active ones.
+
+    :param values: np.ndarray or CellList
+    :param where: Callable[..., np.ndarray]
+    :return: np.ndarray
+    """
+    index = listed_index(*values)
+    if where is not None:
+        index = index[where(*(cell_values(value, index) for value in values))]
+    return index
+
+
+def convertible_cells(model, index: np.ndarray, shape: Tuple[int, int, int]) -> np.ndarray:
+    """
+    Mask of the grid cells at flat indices that belong to a convertible layer (layer type 1 or 3).
+
+    :param model: pycomus.ComusModel
+    :param index: np.ndarray
+    :param shape: Tuple[int, int, int]
+    :return: np.ndarray
+    """
+    lyr_types = np.array([model.layers[layer].lyr_type for layer in range(shape[0])])
+    return np.isin(lyr_types, (1, 3))[index // (shape[1] * shape[2])]
+
+
+def format_cells(index: np.ndarray, shape: Tuple[int, int, int]) -> str:
+    """
+    Text "(layer,row,col), ..." of the grid cells at flat indices, 0-based.
+
+    :param index: np.ndarray
+    :param shape: Tuple[int, int, int]
+    :return: str
+    """
+    return ", ".join(f"({layer},{row},{col})" for layer, row, col in zip(*(axis.tolist() for axis in
+                                                                          np.unravel_index(index, shape))))
+
+
+def report_cells(invalid: np.ndarray, index: np.ndarray, shape: Tuple[int, int, int], message: str) -> bool:
+    """
+    Print `message` with every offending grid cell if any cell is invalid.
+
+    :param invalid: np.ndarray
+        Mask of the invalid cells among `index`.
+    :param index: np.ndarray
+    :param shape: Tuple[int, int, int]
+    :param message: str
+        Message with a `{cells}` field, filled with the offending grid cells.
+    :return: bool
+        False if any cell is invalid.
+    """
+    if not np.any(invalid):
+        return True
+    print(message.format(cells=format_cells(index[invalid], shape)))
+    return False
+
+
+def write_cell_rows(file: TextIO, period: int, index: np.ndarray, shape: Tuple[int, int, int],
+                    columns: List[np.ndarray], end: str = "\n", float_format: Union[str, None] = None):
+    """
+    Write one "IPER  ILYR  IROW  ICOL  ..." row per grid cell of a stress period, 1-based.
+
+    :param file: TextIO
+    :param period: int
+    :param index: np.ndarray
+        Flat index of the grid cells.
+    :param shape: Tuple[int, int, int]
+    :param columns: List[np.ndarray]
+        Values written after the cell of each row, one array per column.
+    :param end: str
+        End of every row.
+    :param float_format: str or None
+        Float format of the values, see `TextTable.check_float_format`.
+    """
+    if index.size == 0:
+        return
+    cells = [axis + 1 for axis in np.unravel_index(index, shape)]
+    write_table(file, [np.full(index.size, period + 1)] + cells + list(columns), end=end, float_format=float_format)
+
+
+def load_periods(file_path: str, description: str, num_fields: int, columns: Dict[str, int],
+                 shape: Tuple[int, int, int]) -> Tuple[Dict[str, Dict[int, np.ndarray]], np.ndarray]:
+    """
+    Load a boundary period file with "IPER  ILYR  IROW  ICOL  ..." rows into one (num_lyr, num_row, num_col) array
+    per parameter and stress period.
+
+    The rows are parsed in bulk a chunk at a time, grouped by IPER with a stable sort and scattered into the
+    period arrays one column at a time. Grid cells without a row are 0, a later row of a cell replaces an earlier one.
+
+    :param file_path: str
+    :param description: str
+        Package description used in the error messages, e.g. "Well(WEL)".
+    :param num_fields: int
+        Number of fields of the header and of every data row.
+    :param columns: Dict[str, int]
+        Data column of each parameter.
+    :param shape: Tuple[int, int, int]
+        (num_lyr, num_row, num_col)
+    :return: Tuple[Dict[str, Dict[int, np.ndarray]], np.ndarray]
+        {parameter: {period: array}} with 0-based periods, and the first data row.
+    """
+    res = {name: {} for name in columns}
+    first_row = None
+    with open(file_path, 'r') as file:
+        if len(file.readline().strip().split()) != num_fields:
+            raise ValueError(f"The {description} Period Attribute file header should have {num_fields} fields.")
+        while True:
+            try:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", UserWarning)
+                    data = np.loadtxt(file, dtype=float, ndmin=2, max_rows=CHUNK_ROWS)
+            except ValueError:
+                raise ValueError(f"The {description} Period Attribute file data line should have {num_fields} values.")
+            if data.shape[0] == 0:
+                break
+            if data.shape[1] != num_fields:
+                raise ValueError(f"The {description} Period Attribute file data line should have {num_fields} values.")
+            if first_row is None:
+                first_row = data[0]
+            periods = data[:, 0].astype(np.int64) - 1
+            try:
+                index = np.ravel_multi_index(tuple(data[:, 1:4].astype(np.int64).T - 1), shape)
+            except ValueError:
+                raise ValueError(f"The {description} Period Attribute file has grid cells outside of the model grid "
+                                 f"{shape}.")
+            order = np.argsort(periods, kind="stable")
+            keys, starts = np.unique(periods[order], return_index=True)
+            for period, rows in zip(keys.tolist(), np.split(order, starts[1:])):
+                for name, column in columns.items():
+                    if period not in res[name]:
+                        res[name][period] = np.zeros(shape)
+                    res[name][period].reshape(-1)[index[rows]] = data[rows, column]
+    if first_row is None:
+        raise ValueError(f"The {description} Period Attribute file data line should have {num_fields} values.")
+    return res, first_row
@@ -61,3 +61,5 @@ CELLHH_FILE_NAME = "CELLHH.out"
 CELLDD_FILE_NAME = "CELLDD.out"
 CELLFL_FILE_NAME = "CELLFL.out"
 CELLBD_FILE_NAME = "CELLBD.out"
+OUT_INDEX_FILE_NAME = "Data.out.idx"
+IN_MANIFEST_FILE_NAME = "Data.in.manifest"
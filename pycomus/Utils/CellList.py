@@ -0,0 +1,127 @@
+# --------------------------------------------------------------
+# CellList.py
+# Version: 1.0.0
+# Author: Zhenjiang Wu
+# Description: Sparse Grid Cell List Storage Of Boundary Parameters.
+# --------------------------------------------------------------
+from typing import Tuple, Union
+
+import numpy as np
+
+
+class CellList:
+    """
+    Values of a boundary parameter at a list of grid cells, stored as (cells, values) instead of a dense
+    (num_lyr, num_row, num_col) array. Cells that are not in the list have the value 0.
+
+    Attributes:
+    ----------------------------
+    cells: np.ndarray
+        (layer, row, col) of each listed grid cell with shape (n, 3), 0-based, sorted in layer, row, col order.
+    values: np.ndarray
+        Value of each listed grid cell with shape (n,).
+    shape: Tuple[int, int, int]
+        (num_lyr, num_row, num_col) of the model grid.
+    index: np.ndarray
+        Flat index of each listed grid cell in a (num_lyr, num_row, num_col) array.
+
+    Methods:
+    --------
+    to_dense(self) -> np.ndarray
+        Materialize the (num_lyr, num_row, num_col) array.
+
+    values_at(self, index: np.ndarray) -> np.ndarray
+        Values at flat grid cell indices, 0 for the cells that are not listed.
+
+    Example:
+    --------
+    >>> wells = CellList([(0, 3, 12), (1, 5, 7)], [-500, -250], (2, 20, 20))
+    >>> wellr = wells.to_dense()
+    """
+
+    def __init__(self, cells: Union[np.ndarray, list], values: Union[np.ndarray, list, int, float],
+                 shape: Tuple[int, int, int]):
+        cells = np.asarray(cells, dtype=np.int64)
+        if cells.ndim == 1 and cells.size == 3:
+            cells = cells.reshape(1, 3)
+        if cells.ndim != 2 or cells.shape[1] != 3:
+            raise ValueError("cells should be a list of (layer, row, col) with shape (n, 3).")
+        values = np.asarray(values)
+        if values.ndim == 0:
+            values = np.full(cells.shape[0], values)
+        if values.shape != (cells.shape[0],):
+            raise ValueError(f"values should be a number or have one value per cell ({cells.shape[0]}).")
+        for axis, (axis_name, size) in enumerate(zip(("layer", "row", "col"), shape)):
+            if np.any(cells[:, axis] < 0) or np.any(cells[:, axis] >= size):
+                raise ValueError(f"The {axis_name} of cells should be greater than or equal to 0, and less than {size}.")
+        index = np.ravel_multi_index(tuple(cells.T), shape) if cells.size else np.zeros(0, dtype=np.int64)
+        order = np.argsort(index, kind="stable")
+        index = index[order]
+        if np.any(index[1:] == index[:-1]):
+            duplicate = np.unravel_index(index[1:][index[1:] == index[:-1]][0], shape)
+            raise ValueError(f"Grid cell {tuple(int(x) for x in duplicate)} is listed more than once.")
+        self.shape: Tuple[int, int, int] = tuple(shape)
+        self.index: np.ndarray = index
+        self.cells: np.ndarray = cells[order]
+        self.values: np.ndarray = values[order]
+
+    def __len__(self) -> int:
+        return self.index.size
+
+    def __repr__(self):
+        return f"CellList(cells={len(self)}, shape={self.shape})"
+
+    def to_dense(self) -> np.ndarray:
+        """
+        Materialize the (num_lyr, num_row, num_col) array.
+
+        :return: np.ndarray
+        """
+        res = np.zeros(self.shape, dtype=self.values.dtype)
+        res.reshape(-1)[self.index] = self.values
+        return res
+
+    def values_at(self, index: np.ndarray) -> np.ndarray:
+        """
+        Values at flat grid cell indices, 0 for the cells that are not listed.
+
+        :param index: np.ndarray
+        :return: np.ndarray
+        """
+        index = np.asarray(index, dtype=np.int64)
+        res = np.zeros(index.shape, dtype=self.values.dtype)
+        if self.index.size:
+            pos = np.minimum(np.searchsorted(self.index, index), self.index.size - 1)
+            found = self.index[pos] == index
+            res[found] = self.values[pos[found]]
+        return res
+
+
+def cell_values(value: Union[np.ndarray, CellList], index: np.ndarray) -> np.ndarray:
+    """
+    Values of a dense (num_lyr, num_row, num_col) array or a `CellList` at flat grid cell indices.
+
+    :param value: np.ndarray or CellList
+    :param index: np.ndarray
+    :return: np.ndarray
+    """
+    if isinstance(value, CellList):
+        return value.values_at(index)
+    return value.reshape(-1)[index]
+
+
+def listed_index(*values: Union[np.ndarray, CellList]) -> np.ndarray:
+    """
+    Flat index, in layer, row, col order, of the grid cells that can hold a nonzero value in every one of `values`:
+    the cells listed by all the `CellList` values, or every grid cell if all the values are dense arrays.
+
+    :param values: np.ndarray or CellList
+    :return: np.ndarray
+    """
+    index = None
+    for value in values:
+        if isinstance(value, CellList):
+            index = value.index if index is None else np.intersect1d(index, value.index, assume_unique=True)
+    if index is None:
+        return np.arange(values[0].size)
+    return index
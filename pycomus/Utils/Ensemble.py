@@ -0,0 +1,254 @@
+# --------------------------------------------------------------
+# Ensemble.py
+# Version: 1.0.0
+# Author: Zhenjiang Wu
+# Description: Run Variants Of A COMUS Model In Parallel, Each In Its Own Workspace.
+# --------------------------------------------------------------
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Union
+
+import numpy as np
+
+from pycomus.Utils.ReadData import ComusData
+from pycomus.Utils.SolverProcess import pool_context, run_error
+
+# ComusData reader of each output that an ensemble can collect
+OUTPUT_READERS = {"head": "read_heads", "dropdown": "read_dropdowns", "flow": "read_flos"}
+
+
+class EnsembleResult(NamedTuple):
+    """
+    Result of `ComusEnsemble.run`.
+
+    Attributes:
+    ----------------------------
+    outputs: Dict[str, np.ndarray]
+        Every collected output stacked over the members with shape (num_members, ...), NaN for the members that
+        failed. The flow of a member has the x, y and z directions stacked on its first axis. If the members have
+        outputs of different shapes, an object array of the member arrays (None for the members that failed).
+    succeeded: np.ndarray
+        True for every member that ran successfully.
+    attempts: np.ndarray
+        Number of times every member was run.
+    wall_times: np.ndarray
+        Time in seconds of the last solver run of every member, NaN if the solver did not run.
+    errors: Dict[int, str]
+        Error of the last attempt of every member that failed.
+    paths: List[str]
+        Model folder of every member.
+    """
+    outputs: Dict[str, np.ndarray]
+    succeeded: np.ndarray
+    attempts: np.ndarray
+    wall_times: np.ndarray
+    errors: Dict[int, str]
+    paths: List[str]
+
+
+class ComusEnsemble:
+    """
+    Run variants of a COMUS Model in parallel. Every member is a copy of a model that writes its files and runs in
+    its own workspace <workspace>/member_<i>, so the members never share files and the current working directory is
+    not used.
+
+    Attributes:
+    ----------------------------
+    workspace: str
+        Folder that holds the workspace of every member.
+    max_workers: int or None
+        Number of worker processes, None uses one process per CPU.
+    retries: int
+        Number of times a member that fails is run again.
+    outputs: Dict[str, Dict[str, Any]]
+        Outputs collected from every member ("head", "dropdown" or "flow"), with the keyword arguments (period,
+        step, layer) of the `pycomus.ComusData` reader of each.
+    members: List[pycomus.ComusModel]
+
+    Methods:
+    --------
+    add(self, model) -> int
+        Add a copy of a model as a member.
+
+    add_variants(self, base, overrides: List[Union[Dict[str, Any], Callable]]) -> List[int]
+        Add one member per override, a copy of the base model with the override applied.
+
+    run(self) -> EnsembleResult
+        Run every member and collect its outputs.
+
+    Returns:
+    --------
+    instance: pycomus.ComusEnsemble
+
+    Example:
+    --------
+    >>> import pycomus
+    >>> ensemble = pycomus.ComusEnsemble("./runs", retries=1, outputs={"head": {"layer": 0}})
+    >>> ensemble.add_variants(model, [{"grid_arrays.hk": hk} for hk in (5, 10, 20)])
+    >>> result = ensemble.run()
+    >>> heads = result.outputs["head"]
+    """
+
+    def __init__(self, workspace: str, max_workers: Union[int, None] = None, retries: int = 0,
+                 outputs: Union[List[str], Dict[str, Dict[str, Any]]] = ("head",)):
+        if not isinstance(workspace, str):
+            raise ValueError("workspace should be of type str.")
+        if max_workers is not None and (not isinstance(max_workers, int) or max_workers < 1):
+            raise ValueError("max_workers should be an int greater than or equal to 1, or None.")
+        if not isinstance(retries, int) or retries < 0:
+            raise ValueError("retries should be an int greater than or equal to 0.")
+        if not isinstance(outputs, dict):
+            outputs = {name: {} for name in outputs}
+        for name in outputs:
+            if name not in OUTPUT_READERS:
+                raise ValueError(f"outputs should be in {list(OUTPUT_READERS)}.")
+        self.workspace: str = os.path.abspath(workspace)
+        self.max_workers: Union[int, None] = max_workers
+        self.retries: int = retries
+        self.outputs: Dict[str, Dict[str, Any]] = {name: dict(kwargs or {}) for name, kwargs in outputs.items()}
+        self.members: List = []
+
+    def add(self, model) -> int:
+        """
+        Add a copy of a model as a member, the model itself is not changed.
+
+        :param model: pycomus.ComusModel
+        :return: int
+            Index of the member.
+        """
+        member = copy.deepcopy(model)
+        _unshare_periods(member)
+        member.workspace = os.path.join(self.workspace, f"member_{len(self.members):04d}")
+        self.members.append(member)
+        return len(self.members) - 1
+
+    def add_variants(self, base, overrides: List[Union[Dict[str, Any], Callable]]) -> List[int]:
+        """
+        Add one member per override, a copy of the base model with the override applied.
+
+        An override is either a callable that receives the copy and changes it, or a dict of attribute paths and
+        values such as {"grid_arrays.hk": hk, "package.CMS_PARS.max_iter": 500}: every dotted part is an attribute,
+        or a key of a dict such as `model.package`. An array attribute is overwritten in place, so the views of it
+        (e.g. the grid cells of the layers) keep following it. The values are not checked like the package
+        constructors check them.
+
+        :param base: pycomus.ComusModel
+        :param overrides: List[Dict[str, Any] or Callable]
+        :return: List[int]
+            Index of every added member.
+        """
+        res = []
+        for override in overrides:
+            member = copy.deepcopy(base)
+            if callable(override):
+                override(member)
+            elif isinstance(override, dict):
+                for path, value in override.items():
+                    _set_path(member, path, value)
+            else:
+                raise ValueError("An override should be a dict of attribute paths and values, or a callable.")
+            res.append(self.add(member))
+        return res
+
+    def run(self) -> EnsembleResult:
+        """
+        Write and run every member and collect its outputs.
+
+        The members run in a pool of worker processes, each member writes its files, runs the solver in a process of
+        its own and reads its outputs. A member that fails does not stop the others, it is run again up to `retries`
+        times, and the members that still fail are reported in `EnsembleResult.errors`.
+
+        :return: EnsembleResult
+        """
+        num_members = len(self.members)
+        if num_members == 0:
+            raise ValueError("The ensemble has no members.")
+        collected: List[Union[Dict[str, np.ndarray], None]] = [None] * num_members
+        attempts = np.zeros(num_members, dtype=int)
+        wall_times = np.full(num_members, np.nan)
+        errors: Dict[int, str] = {}
+        pending = list(range(num_members))
+        workers = min(self.max_workers or os.cpu_count() or 1, num_members)
+        for _ in range(self.retries + 1):
+            if not pending:
+                break
+            # A new pool for every round, a worker that died does not break the next round
+            with ProcessPoolExecutor(max_workers=min(workers, len(pending)), mp_context=pool_context()) as executor:
+                futures = {i: executor.submit(_run_member, self.members[i], self.outputs) for i in pending}
+            pending = []
+            for i, future in futures.items():
+                attempts[i] += 1
+                error = future.exception()
+                if error is None:
+                    collected[i], wall_times[i] = future.result()
+                    errors.pop(i, None)
+                else:
+                    errors[i] = f"{type(error).__name__}({error})"
+                    pending.append(i)
+        outputs = {name: _stack([None if values is None else values[name] for values in collected])
+                   for name in self.outputs}
+        return EnsembleResult(outputs, np.array([values is not None for values in collected]), attempts, wall_times,
+                              errors, [member.model_path for member in self.members])
+
+    def __str__(self):
+        return f"ComusEnsemble:\n    Workspace: {self.workspace}\n    Members: {len(self.members)}"
+
+    def __repr__(self):
+        return f"ComusEnsemble(workspace='{self.workspace}', members={len(self.members)})"
+
+
+def _unshare_periods(model):
+    # A deep copy keeps an array given for several periods (or packages) shared, every period gets its own copy
+    seen = set()
+    for pkg in model.package.values():
+        for value in vars(pkg).values():
+            if not isinstance(value, dict):
+                continue
+            for key, item in value.items():
+                if isinstance(item, np.ndarray) or hasattr(item, "__dict__"):
+                    if id(item) in seen:
+                        value[key] = item = copy.deepcopy(item)
+                    seen.add(id(item))
+
+
+def _set_path(model, path: str, value):
+    parts = path.split(".")
+    target = model
+    for part in parts[:-1]:
+        target = target[part] if isinstance(target, dict) else getattr(target, part)
+    current = target[parts[-1]] if isinstance(target, dict) else getattr(target, parts[-1])
+    if isinstance(current, np.ndarray):
+        current[...] = value
+    elif isinstance(target, dict):
+        target[parts[-1]] = value
+    else:
+        setattr(target, parts[-1], value)
+
+
+def _run_member(model, outputs: Dict[str, Dict[str, Any]]):
+    model.write_files()
+    result = model.run_async().result()
+    error = run_error(result)
+    if error is not None:
+        raise RuntimeError(error)
+    data = ComusData(model, cache_size=0)
+    res = {}
+    for name, kwargs in outputs.items():
+        values = getattr(data, OUTPUT_READERS[name])(**kwargs)
+        res[name] = np.stack(values) if isinstance(values, tuple) else values
+    return res, result.wall_time
+
+
+def _stack(arrays: List[Union[np.ndarray, None]]) -> np.ndarray:
+    shapes = {array.shape for array in arrays if array is not None}
+    if len(shapes) == 1:
+        res = np.full((len(arrays),) + shapes.pop(), np.nan)
+        for i, array in enumerate(arrays):
+            if array is not None:
+                res[i] = array
+        return res
+    res = np.empty(len(arrays), dtype=object)
+    for i, array in enumerate(arrays):
+        res[i] = array
+    return res
@@ -0,0 +1,102 @@
+# --------------------------------------------------------------
+# LayerCache.py
+# Version: 1.0.0
+# Author: Zhenjiang Wu
+# Description: Bounded LRU Cache For Decoded Output Layers.
+# --------------------------------------------------------------
+from collections import OrderedDict, namedtuple
+from typing import Hashable, Optional, Tuple
+
+import numpy as np
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "max_bytes", "curr_bytes", "entries"])
+
+
+class LayerCache:
+    """
+    Least-recently-used cache of decoded output layers bounded by a byte budget.
+
+    Keys are tuples whose first two items are the output file name and its version (modification time), entries
+    of an older version of a file are dropped as soon as a newer version is seen, so re-running the model
+    invalidates them.
+
+    Attributes:
+    ----------------------------
+    max_bytes: int
+        Byte budget of the cached arrays, 0 disables the cache.
+
+    Example:
+    --------
+    >>> cache = LayerCache(64 * 1024 * 1024)
+    >>> cache.put(("CELLHH.out", 1, 0, 0, 0, "HEAD"), np.zeros((20, 20)))
+    >>> layer = cache.get(("CELLHH.out", 1, 0, 0, 0, "HEAD"))
+    """
+
+    def __init__(self, max_bytes: int):
+        if not isinstance(max_bytes, (int, np.integer)) or max_bytes < 0:
+            raise ValueError("max_bytes should be an int greater than or equal to 0.")
+        self.max_bytes: int = int(max_bytes)
+        self.hits: int = 0
+        self.misses: int = 0
+        self._curr_bytes: int = 0
+        self._data: "OrderedDict[Tuple, np.ndarray]" = OrderedDict()
+        self._versions = {}
+
+    def get(self, key: Tuple) -> Optional[np.ndarray]:
+        """
+        Cached array of key, or None on a miss.
+
+        :param key: Tuple
+        :return: np.ndarray
+        """
+        self._check_version(key[0], key[1])
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Tuple, value: np.ndarray):
+        """
+        Cache an array and evict the least recently used ones until the byte budget is respected.
+
+        :param key: Tuple
+        :param value: np.ndarray
+        """
+        self._check_version(key[0], key[1])
+        if value.nbytes > self.max_bytes:
+            return
+        if key in self._data:
+            self._curr_bytes -= self._data.pop(key).nbytes
+        value.flags.writeable = False
+        self._data[key] = value
+        self._curr_bytes += value.nbytes
+        while self._curr_bytes > self.max_bytes:
+            _, evicted = self._data.popitem(last=False)
+            self._curr_bytes -= evicted.nbytes
+
+    def clear(self):
+        """
+        Drop every cached array and reset the counters.
+        """
+        self._data.clear()
+        self._versions.clear()
+        self._curr_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> CacheInfo:
+        """
+        Hit/miss counters and memory use of the cache.
+
+        :return: CacheInfo
+        """
+        return CacheInfo(self.hits, self.misses, self.max_bytes, self._curr_bytes, len(self._data))
+
+    def _check_version(self, file_name: Hashable, version: Hashable):
+        if self._versions.get(file_name, version) != version:
+            for key in [key for key in self._data if key[0] == file_name]:
+                self._curr_bytes -= self._data.pop(key).nbytes
+        self._versions[file_name] = version
@@ -0,0 +1,252 @@
+# --------------------------------------------------------------
+# OutArchive.py
+# Version: 1.0.0
+# Author: Zhenjiang Wu
+# Description: Chunked Compressed Archive Of COMUS Model Output.
+# --------------------------------------------------------------
+import os
+import zipfile
+from typing import Dict, Iterator, List, Tuple, Union
+
+import numpy as np
+
+ARCHIVE_FORMATS = ("npz", "hdf5")
+
+
+def write_archive(path: str, groups: Dict[str, Tuple[List[str], Iterator[Tuple[int, int, float, Dict]]]],
+                  shape: Tuple[int, int, int], archive_format: str = "npz"):
+    """
+    Write output groups into a chunked compressed archive, every (time step, layer) of a record is one chunk.
+
+    :param path: str
+        Archive file to create, an existing file is overwritten.
+    :param groups: Dict[str, Tuple[List[str], Iterator]]
+        Group name -> (record names, iterator of (period, step, time, {record name: (num_lyr, num_row, num_col)})).
+    :param shape: Tuple[int, int, int]
+        (num_lyr, num_row, num_col) of the model grid.
+    :param archive_format: str
+        "npz" (compressed zip of .npy chunks, no extra dependency) or "hdf5" (requires h5py).
+    """
+    if archive_format not in ARCHIVE_FORMATS:
+        raise ValueError(f"archive_format should be one of {list(ARCHIVE_FORMATS)}.")
+    if archive_format == "npz":
+        _write_npz(path, groups, shape)
+    else:
+        _write_hdf5(path, groups, shape)
+
+
+def _write_npz(path: str, groups, shape: Tuple[int, int, int]):
+    def write_array(zip_file, key, array):
+        with zip_file.open(key + ".npy", "w", force_zip64=True) as file:
+            np.lib.format.write_array(file, np.asarray(array))
+
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as zip_file:
+        write_array(zip_file, "shape", np.array(shape, dtype=np.int64))
+        write_array(zip_file, "groups", np.array(list(groups), dtype=str))
+        for group, (names, steps) in groups.items():
+            periods, kstps, times = [], [], []
+            for i, (period, step, time, data) in enumerate(steps):
+                periods.append(period)
+                kstps.append(step)
+                times.append(time)
+                for name in names:
+                    for layer in range(shape[0]):
+                        write_array(zip_file, f"{group}/{name}/{i}/{layer}", data[name][layer])
+            write_array(zip_file, f"{group}/names", np.array(names, dtype=str))
+            write_array(zip_file, f"{group}/period", np.array(periods, dtype=np.int64))
+            write_array(zip_file, f"{group}/step", np.array(kstps, dtype=np.int64))
+            write_array(zip_file, f"{group}/time", np.array(times, dtype=float))
+
+
+def _write_hdf5(path: str, groups, shape: Tuple[int, int, int]):
+    try:
+        import h5py
+    except ImportError:
+        raise ImportError("Exporting to hdf5 requires h5py, please install it or use archive_format='npz'.")
+    with h5py.File(path, "w") as h5_file:
+        h5_file.attrs["shape"] = np.array(shape, dtype=np.int64)
+        for group, (names, steps) in groups.items():
+            h5_group = h5_file.create_group(group)
+            h5_group.attrs["names"] = np.array(names, dtype=h5py.string_dtype())
+            datasets = {name: h5_group.create_dataset(name, shape=(0,) + shape, maxshape=(None,) + shape,
+                                                      dtype=np.float32, chunks=(1, 1) + shape[1:],
+                                                      compression="gzip", shuffle=True)
+                        for name in names}
+            periods, kstps, times = [], [], []
+            for i, (period, step, time, data) in enumerate(steps):
+                periods.append(period)
+                kstps.append(step)
+                times.append(time)
+                for name in names:
+                    datasets[name].resize(i + 1, axis=0)
+                    datasets[name][i] = data[name]
+            h5_group.create_dataset("period", data=np.array(periods, dtype=np.int64))
+            h5_group.create_dataset("step", data=np.array(kstps, dtype=np.int64))
+            h5_group.create_dataset("time", data=np.array(times, dtype=float))
+
+
+class ComusArchive:
+    """
+    Lazy reader of an archive written by `pycomus.ComusData.export`.
+
+    Only the coordinates are read when the archive is opened, `read` decompresses just the (time step, layer)
+    chunks that are selected.
+
+    Attributes:
+    ----------------------------
+    path: str
+        Archive file written by `pycomus.ComusData.export`, npz or hdf5.
+
+    Methods:
+    --------
+    groups(self) -> List[str]
+        Output groups in the archive, some of "head", "dropdown", "flow" and "bd".
+
+    names(self, group: str) -> List[str]
+        Record names of a group, e.g. "HEAD" or the balance terms.
+
+    coords(self, group: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]
+        Stress period, output time step within the period and simulation time of every time step of a group.
+
+    read(self, group: str, name: str, period=None, step=None, layer=None) -> np.ndarray
+        Read a record for several stress periods, time steps and layers.
+
+    close(self)
+        Close the archive file.
+
+    Example:
+    --------
+    >>> data = pycomus.ComusData(model)
+    >>> data.export("./OneDimFlowSim.npz")
+    >>> with pycomus.ComusArchive("./OneDimFlowSim.npz") as archive:
+    ...     heads = archive.read("head", "HEAD", period=1, layer=0)
+    """
+
+    def __init__(self, path: str):
+        if not os.path.exists(path):
+            raise IOError(f"{path} does not exist!")
+        self.path: str = path
+        self._coords: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        self._names: Dict[str, List[str]] = {}
+        if zipfile.is_zipfile(path):
+            self._h5_file = None
+            self._npz_file = np.load(path)
+            self._shape = tuple(int(x) for x in self._npz_file["shape"])
+            for group in self._npz_file["groups"]:
+                group = str(group)
+                self._names[group] = [str(name) for name in self._npz_file[f"{group}/names"]]
+                self._coords[group] = tuple(self._npz_file[f"{group}/{coord}"] for coord in ("period", "step", "time"))
+        else:
+            try:
+                import h5py
+            except ImportError:
+                raise ImportError(f"Reading {path} requires h5py, please install it.")
+            self._npz_file = None
+            self._h5_file = h5py.File(path, "r")
+            self._shape = tuple(int(x) for x in self._h5_file.attrs["shape"])
+            for group in self._h5_file:
+                self._names[group] = [str(name) for name in self._h5_file[group].attrs["names"]]
+                self._coords[group] = tuple(self._h5_file[group][coord][()] for coord in ("period", "step", "time"))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def groups(self) -> List[str]:
+        """
+        Output groups in the archive, some of "head", "dropdown", "flow" and "bd".
+
+        :return: List[str]
+        """
+        return list(self._names)
+
+    def names(self, group: str) -> List[str]:
+        """
+        Record names of a group, e.g. "HEAD" or the balance terms.
+
+        :param group: str
+        :return: List[str]
+        """
+        self._check_group(group)
+        return list(self._names[group])
+
+    def coords(self, group: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Stress period, output time step within the period and simulation time of every time step of a group.
+
+        :param group: str
+        :return: Tuple[np.ndarray, np.ndarray, np.ndarray]
+        """
+        self._check_group(group)
+        return self._coords[group]
+
+    def read(self, group: str, name: str, period: Union[int, slice, List[int], None] = None,
+             step: Union[int, slice, List[int], None] = None,
+             layer: Union[int, slice, List[int], None] = None) -> np.ndarray:
+        """
+        Read a record for several stress periods, time steps and layers, only the selected chunks are decompressed.
+
+        :param group: str
+        :param name: str
+        :param period: int, slice or List[int], by default all stress periods in the archive
+        :param step: int, slice or List[int], applied to the output time steps of each selected stress period,
+            by default all time steps
+        :param layer: int, slice or List[int], by default all layers
+        :return: np.ndarray
+            Data with shape (n_steps, n_layers, num_row, num_col) in simulation order, the layer axis is dropped
+            when layer is an int.
+        """
+        self._check_group(group)
+        if name not in self._names[group]:
+            raise ValueError(f"{name} is not in group {group}, available names are {self._names[group]}.")
+        periods = self._coords[group][0]
+        selected = np.zeros(periods.size, dtype=bool)
+        for tar_period in self._select(period, np.unique(periods), "period"):
+            in_period = np.flatnonzero(periods == tar_period)
+            selected[self._select(step, in_period, "step")] = True
+        steps = np.flatnonzero(selected)
+        layers = self._select(layer, np.arange(self._shape[0]), "layer")
+        res = np.zeros((steps.size, layers.size) + self._shape[1:])
+        for i, tar_step in enumerate(steps):
+            for j, tar_layer in enumerate(layers):
+                res[i, j] = self._read_chunk(group, name, tar_step, tar_layer)
+        return res[:, 0] if isinstance(layer, (int, np.integer)) else res
+
+    def close(self):
+        """
+        Close the archive file.
+        """
+        if self._npz_file is not None:
+            self._npz_file.close()
+        if self._h5_file is not None:
+            self._h5_file.close()
+
+    def _read_chunk(self, group: str, name: str, tar_step: int, tar_layer: int) -> np.ndarray:
+        if self._h5_file is not None:
+            return self._h5_file[group][name][tar_step, tar_layer]
+        return self._npz_file[f"{group}/{name}/{tar_step}/{tar_layer}"]
+
+    def _check_group(self, group: str):
+        if group not in self._names:
+            raise ValueError(f"{group} is not in the archive, available groups are {list(self._names)}.")
+
+    @staticmethod
+    def _select(selector: Union[int, slice, List[int], None], values: np.ndarray, axis_name: str) -> np.ndarray:
+        if selector is None:
+            return values
+        if axis_name == "period":
+            # Stress periods are selected by their number, not by their position in the archive
+            try:
+                selected = np.atleast_1d(np.arange(int(values.max()) + 1 if values.size else 0)[selector])
+            except IndexError:
+                raise ValueError(f"period {selector} is not in the archive.")
+            missing = np.setdiff1d(selected, values)
+            if missing.size:
+                raise ValueError(f"period {missing.tolist()} is not in the archive.")
+            return selected
+        try:
+            return np.atleast_1d(values[selector])
+        except IndexError:
+            raise ValueError(f"{axis_name} {selector} is out of range, there are {values.size} {axis_name}s.")
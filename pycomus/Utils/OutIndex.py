@@ -0,0 +1,181 @@
+# --------------------------------------------------------------
+# OutIndex.py
+# Version: 1.0.0
+# Author: Zhenjiang Wu
+# Description: Byte-Offset Index Of COMUS Binary Output Records.
+# --------------------------------------------------------------
+import os
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from pycomus.Utils import CONSTANTS, OutLayout
+
+INDEX_DTYPE = np.dtype([("period", "<i4"), ("step", "<i4"), ("kstp", "<i4"), ("layer", "<i4"), ("name", "S16"),
+                        ("totim", "<f8"), ("offset", "<i8")])
+
+
+class RecordIndex:
+    """
+    Byte-offset index of the records in the COMUS binary output files (CELLHH/CELLDD/CELLFL/CELLBD.out).
+
+    Every record header is parsed once and the (period, step, layer, record name) -> byte offset of the layer data
+    is kept in a sidecar file <Data.out.idx> next to <Data.out>. The index of an output file is reused until its
+    modification time or size changes. `period` is the 0-based stress period and `step` the 0-based order of the
+    output time step within that period, so lookups do not depend on NSTEP or on the output control options.
+
+    Attributes:
+    ----------------------------
+    out_path: str
+        The <Data.out> folder of the model.
+
+    Example:
+    --------
+    >>> index = RecordIndex("./OneDimFlowSim/Data.out")
+    >>> offset = index.offset("CELLHH.out", period=0, step=0, layer=0, name="HEAD")
+    """
+
+    def __init__(self, out_path: str):
+        self.out_path: str = out_path
+        self.index_file: str = os.path.join(os.path.dirname(os.path.normpath(out_path)),
+                                            CONSTANTS.OUT_INDEX_FILE_NAME)
+        self._entries: Dict[str, np.ndarray] = {}
+        self._stats: Dict[str, Tuple[int, int]] = {}
+        self._lookup: Dict[str, Dict[Tuple[int, int, int, str], int]] = {}
+        self._load()
+
+    def entries(self, file_name: str) -> np.ndarray:
+        """
+        All records of an output file in file order, as a structured array of INDEX_DTYPE.
+
+        :param file_name: str
+        :return: np.ndarray
+        """
+        self._refresh(file_name)
+        return self._entries[file_name]
+
+    def offset(self, file_name: str, period: int, step: int, layer: int, name: str) -> int:
+        """
+        Byte offset of the layer data of a record, raise KeyError if the record is not in the file.
+
+        :param file_name: str
+        :param period: int
+        :param step: int
+        :param layer: int
+        :param name: str
+        :return: int
+        """
+        self._refresh(file_name)
+        lookup = self._lookup.get(file_name)
+        if lookup is None:
+            lookup = {(int(e["period"]), int(e["step"]), int(e["layer"]), e["name"].decode("utf-8")): int(e["offset"])
+                      for e in self._entries[file_name]}
+            self._lookup[file_name] = lookup
+        return lookup[(period, step, layer, name)]
+
+    def version(self, file_name: str) -> Tuple[int, int]:
+        """
+        Modification time (ns) and size of an output file when it was last indexed.
+
+        :param file_name: str
+        :return: Tuple[int, int]
+        """
+        self._refresh(file_name)
+        return self._stats[file_name]
+
+    def num_steps(self, file_name: str, period: int) -> int:
+        """
+        Number of output time steps written for a stress period.
+
+        :param file_name: str
+        :param period: int
+        :return: int
+        """
+        entries = self.entries(file_name)
+        steps = entries["step"][entries["period"] == period]
+        return int(steps.max()) + 1 if steps.size else 0
+
+    def names(self, file_name: str) -> List[str]:
+        """
+        Record names of an output file in the order they are written within a time step.
+
+        :param file_name: str
+        :return: List[str]
+        """
+        entries = self.entries(file_name)
+        if entries.size == 0:
+            return []
+        first = entries[(entries["period"] == entries["period"][0]) & (entries["step"] == entries["step"][0]) &
+                        (entries["layer"] == 0)]
+        return [name.decode("utf-8") for name in first["name"]]
+
+    def _refresh(self, file_name: str):
+        OutLayout.get_layout(file_name)
+        output_file = os.path.join(self.out_path, file_name)
+        if not os.path.exists(output_file):
+            raise IOError(f"{file_name} not generated! Please check <pycomus.ComusOutputPars>!")
+        stat = os.stat(output_file)
+        if self._stats.get(file_name) == (stat.st_mtime_ns, stat.st_size):
+            return
+        self._entries[file_name] = self._scan(output_file, file_name)
+        self._stats[file_name] = (stat.st_mtime_ns, stat.st_size)
+        self._lookup.pop(file_name, None)
+        self._save()
+
+    @staticmethod
+    def _scan(output_file: str, file_name: str) -> np.ndarray:
+        layout = OutLayout.get_layout(file_name)
+        records = OutLayout.map_records(output_file, file_name)
+        if records.size == 0:
+            return np.zeros(0, dtype=INDEX_DTYPE)
+        kper, kstp = np.asarray(records["kper"]), np.asarray(records["kstp"])
+        # The output time step restarts at 0 in each stress period and moves on when KSTP changes
+        new_step = np.ones(records.size, dtype=bool)
+        new_step[1:] = (kper[1:] != kper[:-1]) | (kstp[1:] != kstp[:-1])
+        step_count = np.cumsum(new_step)
+        period_start = np.r_[True, kper[1:] != kper[:-1]]
+        steps = step_count - np.maximum.accumulate(np.where(period_start, step_count, 0))
+        data_start = np.arange(records.size, dtype=np.int64) * records.dtype.itemsize + layout.header.itemsize
+        if layout.layer_record:
+            entries = np.zeros(records.size, dtype=INDEX_DTYPE)
+            entries["layer"] = records["ilay"] - 1
+            entries["totim"] = records["totim"]
+            entries["offset"] = data_start
+            source = np.arange(records.size)
+        else:
+            num_lyr = records.dtype["data"].shape[0]
+            layer_size = records.dtype["data"].itemsize // num_lyr
+            entries = np.zeros(records.size * num_lyr, dtype=INDEX_DTYPE)
+            entries["layer"] = np.tile(np.arange(num_lyr), records.size)
+            entries["totim"] = np.nan
+            entries["offset"] = np.repeat(data_start, num_lyr) + entries["layer"].astype(np.int64) * layer_size
+            source = np.repeat(np.arange(records.size), num_lyr)
+        entries["period"] = kper[source] - 1
+        entries["step"] = steps[source]
+        entries["kstp"] = kstp[source]
+        entries["name"] = np.char.strip(np.asarray(records["text"])[source])
+        return entries
+
+    def _load(self):
+        if not os.path.exists(self.index_file):
+            return
+        try:
+            with np.load(self.index_file) as data:
+                for file_name in OutLayout.LAYOUTS:
+                    if file_name in data and f"{file_name}.stat" in data:
+                        self._entries[file_name] = data[file_name]
+                        self._stats[file_name] = tuple(int(x) for x in data[f"{file_name}.stat"])
+        except (OSError, ValueError):
+            self._entries.clear()
+            self._stats.clear()
+
+    def _save(self):
+        arrays = {}
+        for file_name, entries in self._entries.items():
+            arrays[file_name] = entries
+            arrays[f"{file_name}.stat"] = np.array(self._stats[file_name], dtype=np.int64)
+        try:
+            with open(self.index_file, "wb") as file:
+                np.savez(file, **arrays)
+        except OSError:
+            pass
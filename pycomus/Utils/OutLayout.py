@@ -0,0 +1,148 @@
+# --------------------------------------------------------------
+# OutLayout.py
+# Version: 1.0.0
+# Author: Zhenjiang Wu
+# Description: Binary Record Layout Of COMUS Output Files.
+# --------------------------------------------------------------
+import os
+from typing import BinaryIO, Dict, NamedTuple, Tuple, Union
+
+import numpy as np
+
+from pycomus.Utils import CONSTANTS
+
+# Header of a record holding one layer: time step, stress period, period time, total time, name, NCOL, NROW, ILAY
+LAYER_HEADER_DTYPE = np.dtype([("kstp", "<i4"), ("kper", "<i4"), ("pertim", "<f4"), ("totim", "<f4"),
+                               ("text", "S16"), ("ncol", "<i4"), ("nrow", "<i4"), ("ilay", "<i4")])
+
+# Header of a record holding every layer: time step, stress period, name, NCOL, NROW, NLAY
+VOLUME_HEADER_DTYPE = np.dtype([("kstp", "<i4"), ("kper", "<i4"), ("text", "S16"), ("ncol", "<i4"),
+                                ("nrow", "<i4"), ("nlay", "<i4")])
+
+
+class RecordLayout(NamedTuple):
+    """
+    Record structure of a COMUS binary output file.
+
+    header: np.dtype
+        Header of every record, the data follows as float32 in (layer,) row, col order.
+    layer_record: bool
+        True if a record holds one layer (ILAY in the header), False if it holds every layer (NLAY in the header).
+    """
+    header: np.dtype
+    layer_record: bool
+
+
+LAYOUTS: Dict[str, RecordLayout] = {
+    CONSTANTS.CELLHH_FILE_NAME: RecordLayout(LAYER_HEADER_DTYPE, True),
+    CONSTANTS.CELLDD_FILE_NAME: RecordLayout(LAYER_HEADER_DTYPE, True),
+    CONSTANTS.CELLFL_FILE_NAME: RecordLayout(VOLUME_HEADER_DTYPE, False),
+    CONSTANTS.CELLBD_FILE_NAME: RecordLayout(VOLUME_HEADER_DTYPE, False),
+}
+
+
+def get_layout(file_name: str) -> RecordLayout:
+    """
+    Record layout of an output file.
+
+    :param file_name: str
+    :return: RecordLayout
+    """
+    if file_name not in LAYOUTS:
+        raise ValueError(f"{file_name} is not a COMUS cell output file.")
+    return LAYOUTS[file_name]
+
+
+def header_size(file_name: str) -> int:
+    """
+    Size in bytes of the record header of an output file.
+
+    :param file_name: str
+    :return: int
+    """
+    return get_layout(file_name).header.itemsize
+
+
+def record_dtype(file_name: str, num_lyr: int, num_row: int, num_col: int) -> np.dtype:
+    """
+    Structured dtype of a whole record (header and data) of an output file.
+
+    :param file_name: str
+    :param num_lyr: int
+    :param num_row: int
+    :param num_col: int
+    :return: np.dtype
+    """
+    layout = get_layout(file_name)
+    data_shape = (num_row, num_col) if layout.layer_record else (num_lyr, num_row, num_col)
+    return np.dtype(layout.header.descr + [("data", "<f4", data_shape)])
+
+
+def map_records(path: str, file_name: str, shape: Union[Tuple[int, int, int], None] = None) -> np.ndarray:
+    """
+    Map the complete records of an output file into memory as a structured array, a partly written last record is
+    left out. Headers can be read for all records at once, the data is only read when accessed.
+
+    :param path: str
+        Path of the output file.
+    :param file_name: str
+        Output file name, selects the layout.
+    :param shape: Tuple[int, int, int]
+        (num_lyr, num_row, num_col), by default taken from the first record header.
+    :return: np.ndarray
+    """
+    layout = get_layout(file_name)
+    file_size = os.path.getsize(path)
+    if shape is None:
+        if file_size < layout.header.itemsize:
+            return np.zeros(0, dtype=record_dtype(file_name, 1, 1, 1))
+        first = np.fromfile(path, dtype=layout.header, count=1)[0]
+        num_lyr = 1 if layout.layer_record else int(first["nlay"])
+        shape = (num_lyr, int(first["nrow"]), int(first["ncol"]))
+        if min(shape) < 1:
+            return np.zeros(0, dtype=record_dtype(file_name, 1, 1, 1))
+    dtype = record_dtype(file_name, *shape)
+    count = file_size // dtype.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    records = np.memmap(path, dtype=dtype, mode="r", shape=(count,))
+    # Stop at the first record whose header does not match the layout
+    valid = (records["nrow"] == shape[1]) & (records["ncol"] == shape[2])
+    if not layout.layer_record:
+        valid &= records["nlay"] == shape[0]
+    if not valid.all():
+        records = records[:int(np.argmin(valid))]
+    return records
+
+
+def read_records(file: BinaryIO, file_name: str, shape: Tuple[int, int, int], count: int) -> np.ndarray:
+    """
+    Read `count` records from the current position of an open output file, raise IOError if the file ends before.
+
+    :param file: BinaryIO
+    :param file_name: str
+    :param shape: Tuple[int, int, int]
+        (num_lyr, num_row, num_col)
+    :param count: int
+    :return: np.ndarray
+    """
+    records = np.fromfile(file, dtype=record_dtype(file_name, *shape), count=count)
+    if records.size != count:
+        raise IOError(f"{file_name} is incomplete.")
+    return records
+
+
+def read_layer(path: str, offset: int, num_row: int, num_col: int) -> np.ndarray:
+    """
+    Read the (num_row, num_col) data of one layer starting at a byte offset of an output file.
+
+    :param path: str
+    :param offset: int
+    :param num_row: int
+    :param num_col: int
+    :return: np.ndarray
+    """
+    data = np.fromfile(path, dtype="<f4", count=num_row * num_col, offset=offset)
+    if data.size != num_row * num_col:
+        raise IOError(f"{os.path.basename(path)} is incomplete.")
+    return data.reshape((num_row, num_col))
@@ -1,10 +1,19 @@
 import os
-import struct
-from typing import Tuple, Dict
+import time
+from typing import Tuple, Dict, List, Union, Iterator
 
 import numpy as np
 
-from pycomus.Utils import CONSTANTS, BoundaryCheck
+from pycomus.Utils import CONSTANTS, BoundaryCheck, OutLayout
+from pycomus.Utils.LayerCache import LayerCache, CacheInfo
+from pycomus.Utils.OutArchive import write_archive
+from pycomus.Utils.OutIndex import RecordIndex
+
+FLOW_RECORD_NAMES = ("FLOW RIGHT FACE", "FLOW FRONT FACE", "FLOW LOWER FACE")
+
+# Group name of each output file in an exported archive
+ARCHIVE_GROUPS = {"head": CONSTANTS.CELLHH_FILE_NAME, "dropdown": CONSTANTS.CELLDD_FILE_NAME,
+                  "flow": CONSTANTS.CELLFL_FILE_NAME, "bd": CONSTANTS.CELLBD_FILE_NAME}
 
 
 class ComusData:
@@ -15,15 +24,21 @@ class ComusData:
     ----------------------------
     model: pycomus.ComusModel
         COMUS Model Object
+    cache_size: int
+        Byte budget of the LRU cache of layers decoded by read_cell_head, read_cell_dropdown, read_cell_flo and
+        read_cell_bd, 0 disables the cache. Cached layers are dropped when the output file changes.
 
     Methods:
     --------
-    __init__(self, model)
+    __init__(self, model, cache_size: int = 64 * 1024 * 1024)
         Read COMUS Model Output Data.
 
     read_cell_head(self, tar_period: int = 0, tar_iter: int = 0, tar_layer: int = 0) -> np.ndarray
         Read groundwater levels for a specific stress period, a certain simulation time frame, and a particular layer.
 
+    memmap_cell_head(self) -> np.ndarray
+        Map the whole groundwater level file into memory as a (time_step, layer, row, col) view.
+
     read_cell_dropdown(self, tar_period: int = 0, tar_iter: int = 0, tar_layer: int = 0) -> np.ndarray
         Read groundwater dropdown for a specific stress period, a certain simulation time frame, and a particular layer.
 
@@ -34,6 +49,52 @@ class ComusData:
     read_cell_bd(self, tar_period: int = 0, tar_iter: int = 0, tar_layer: int = 0) -> Dict
         Read groundwater balance for a specific stress period, a certain simulation time frame, and a particular layer.
 
+    read_bd(self, tar_period: int = 0, tar_iter: int = 0) -> Dict[str, np.ndarray]
+        Read the groundwater balance of every layer for a specific stress period and a certain simulation time frame.
+
+    read_heads(self, period=None, step=None, layer=None) -> np.ndarray
+        Read groundwater levels of several stress periods, time steps and layers at once.
+
+    read_dropdowns(self, period=None, step=None, layer=None) -> np.ndarray
+        Read groundwater dropdown of several stress periods, time steps and layers at once.
+
+    read_flos(self, period=None, step=None, layer=None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]
+        Read groundwater flow of several stress periods, time steps and layers at once.
+
+    iter_heads(self, layers=None) -> Iterator[Tuple[int, int, float, np.ndarray]]
+        Iterate over the groundwater levels of every output time step while keeping only one time step in memory.
+
+    iter_dropdowns(self, layers=None) -> Iterator[Tuple[int, int, float, np.ndarray]]
+        Iterate over the groundwater dropdown of every output time step while keeping only one time step in memory.
+
+    iter_flos(self, layers=None) -> Iterator[Tuple[int, int, float, Tuple[np.ndarray, np.ndarray, np.ndarray]]]
+        Iterate over the groundwater flow of every output time step while keeping only one time step in memory.
+
+    iter_bds(self, layers=None) -> Iterator[Tuple[int, int, float, Dict]]
+        Iterate over the groundwater balance of every output time step while keeping only one time step in memory.
+
+    follow_heads(self, layers=None, poll_interval: float = 1.0, timeout=None) -> Iterator[
+        Tuple[int, int, float, np.ndarray]]
+        Follow the groundwater level file while COMUS is running and yield every completely written time step.
+
+    read_head_timeseries(self, cells) -> Tuple[np.ndarray, np.ndarray]
+        Read groundwater levels of several grid cells for every output time step of every stress period.
+
+    read_dropdown_timeseries(self, cells) -> Tuple[np.ndarray, np.ndarray]
+        Read groundwater dropdown of several grid cells for every output time step of every stress period.
+
+    read_flo_timeseries(self, cells) -> Tuple[np.ndarray, Tuple[np.ndarray, np.ndarray, np.ndarray]]
+        Read groundwater flow of several grid cells for every output time step of every stress period.
+
+    export(self, path: str, archive_format: str = "npz")
+        Convert the output of every time step into a chunked compressed archive read by `pycomus.ComusArchive`.
+
+    cache_info(self) -> CacheInfo
+        Hit/miss counters and memory use of the cache of decoded layers.
+
+    clear_cache(self)
+        Drop every cached layer and reset the cache counters.
+
     Returns:
     --------
     instance: pycomus.ComusData
@@ -47,20 +108,21 @@ class ComusData:
     >>> head = data.read_cell_head(tar_period=25, tar_iter=0, tar_layer=2)
     """
 
-    def __init__(self, model):
+    def __init__(self, model, cache_size: int = 64 * 1024 * 1024):
         self._cms_dis = BoundaryCheck.get_cms_pars(model)
         self._cms_par = BoundaryCheck.get_con_pars(model)
         self._cms_period = BoundaryCheck.get_period(model)
         self._num_lyr = self._cms_dis.num_lyr
         self._num_row = self._cms_dis.num_row
         self._num_col = self._cms_dis.num_col
+        self._shape: Tuple[int, int, int] = (self._num_lyr, self._num_row, self._num_col)
         self._periods = self._cms_period.period
         self._hno_flo = self._cms_par.hno_flo
-        self._model_path: str = os.path.join(os.getcwd(), model.model_name, "Data.out")
-        self._blockLayerSize = self._layer_block_size()
-        self._blockRowSize = self._row_block_size()
+        self._model_path: str = os.path.join(model.model_path, "Data.out")
         self._model = model
         self._package = model.package
+        self._index = RecordIndex(self._model_path)
+        self._cache = LayerCache(cache_size)
 
     def read_cell_head(self, tar_period: int = 0, tar_iter: int = 0, tar_layer: int = 0) -> np.ndarray:
         """
@@ -69,44 +131,26 @@ class ComusData:
         :param tar_period: int
         :param tar_iter: int
         :param tar_layer: int
+        :return: np.ndarray
+        """
+        self._check_target(CONSTANTS.CELLHH_FILE_NAME, tar_period, tar_iter, tar_layer)
+        return self._read_layer(CONSTANTS.CELLHH_FILE_NAME, tar_period, tar_iter, tar_layer, "HEAD")
+
+    def memmap_cell_head(self) -> np.ndarray:
+        """
+        Map the whole groundwater level file into memory without copying it.
+
+        The returned array is a read-only view of <CELLHH.out> with shape (time_step, layer, row, col), where
+        time_step counts every record written for the layers of the model in file order.
+
         :return: np.ndarray
         """
         head_file = os.path.join(self._model_path, CONSTANTS.CELLHH_FILE_NAME)
         if not os.path.exists(head_file):
             raise IOError("Groundwater level file not generated! Please check <pycomus.ComusOutputPars>!")
-        _period = {}
-        for i in range(len(self._periods)):
-            if self._model.package[CONSTANTS.OUT_PKG_NAME].cell_hh == 1:
-                _period[i + 1] = self._periods[i][1]
-            else:
-                _period[i + 1] = 1
-        if tar_layer < 0 or tar_layer >= self._num_lyr:
-            raise ValueError(f"tar_layer should be greater than or equal to 0, and less than {self._num_lyr}.")
-        if tar_period < 0 or tar_period >= len(self._periods):
-            raise ValueError(f"tar_period should be greater than or equal to 0, and less than {len(self._periods)}")
-        if self._model.package[CONSTANTS.OUT_PKG_NAME].cell_hh == 1:
-            iter = _period[tar_period + 1]
-            if tar_iter < 0 or tar_iter >= iter:
-                raise ValueError(f"tar_period should be greater than or equal to 0, and less than {iter}")
-        res = np.zeros((self._num_row, self._num_col))
-        with open(head_file, "rb") as file:
-            for period, iter in _period.items():
-                if (period - 1) != tar_period:
-                    file.seek(self._blockLayerSize * self._num_lyr * int(iter), 1)
-                    continue
-                for it in range(1, int(iter) + 1):
-                    if it - 1 != tar_iter:
-                        file.seek(self._blockLayerSize * self._num_lyr, 1)
-                        continue
-                    for layer in range(self._num_lyr):
-                        if layer != tar_layer:
-                            file.seek(self._blockLayerSize, 1)
-                            continue
-                        file.read(44)
-                        for row in range(self._num_row):
-                            for col in range(self._num_col):
-                                res[row][col] = struct.unpack('f', file.read(4))[0]
-        return res
+        records = OutLayout.map_records(head_file, CONSTANTS.CELLHH_FILE_NAME, self._shape)
+        num_step = records.size // self._num_lyr
+        return records["data"][:num_step * self._num_lyr].reshape((num_step,) + self._shape)
 
     def read_cell_dropdown(self, tar_period: int = 0, tar_iter: int = 0, tar_layer: int = 0) -> np.ndarray:
         """
@@ -117,42 +161,8 @@ class ComusData:
         :param tar_layer: int
         :return: np.ndarray
         """
-        dropdown_file = os.path.join(self._model_path, CONSTANTS.CELLHH_FILE_NAME)
-        if not os.path.exists(dropdown_file):
-            raise IOError("Groundwater dropdown file not generated! Please check <pycomus.ComusOutputPars>!")
-        _period = {}
-        for i in range(len(self._periods)):
-            if self._model.package[CONSTANTS.OUT_PKG_NAME].cell_dd == 1:
-                _period[i + 1] = self._periods[i][1]
-            else:
-                _period[i + 1] = 1
-        if tar_layer < 0 or tar_layer >= self._num_lyr:
-            raise ValueError(f"tar_layer should be greater than or equal to 0, and less than {self._num_lyr}.")
-        if tar_period < 0 or tar_period >= len(self._periods):
-            raise ValueError(f"tar_period should be greater than or equal to 0, and less than {len(self._periods)}")
-        if self._model.package[CONSTANTS.OUT_PKG_NAME].cell_dd == 1:
-            iter = _period[tar_period + 1]
-            if tar_iter < 0 or tar_iter >= iter:
-                raise ValueError(f"tar_period should be greater than or equal to 0, and less than {iter}")
-        res = np.zeros((self._num_row, self._num_col))
-        with open(dropdown_file, "rb") as file:
-            for period, iter in _period.items():
-                if (period - 1) != tar_period:
-                    file.seek(self._blockLayerSize * self._num_lyr * iter, 1)
-                    continue
-                for it in range(1, iter + 1):
-                    if it - 1 != tar_iter:
-                        file.seek(self._blockLayerSize * self._num_lyr, 1)
-                        continue
-                    for layer in range(self._num_lyr):
-                        if layer != tar_layer:
-                            file.seek(self._blockLayerSize, 1)
-                            continue
-                        file.read(44)
-                        for row in range(self._num_row):
-                            for col in range(self._num_col):
-                                res[row][col] = struct.unpack('f', file.read(4))[0]
-        return res
+        self._check_target(CONSTANTS.CELLDD_FILE_NAME, tar_period, tar_iter, tar_layer)
+        return self._read_layer(CONSTANTS.CELLDD_FILE_NAME, tar_period, tar_iter, tar_layer, "DRAWDOWN")
 
     def read_cell_flo(self, tar_period: int = 0, tar_iter: int = 0, tar_layer: int = 0) -> Tuple[
         np.ndarray, np.ndarray, np.ndarray]:
@@ -164,54 +174,15 @@ class ComusData:
         :param tar_layer: int
         :return: Tuple[np.ndarray, np.ndarray, np.ndarray]
         """
-        flow_file = os.path.join(self._model_path, CONSTANTS.CELLHH_FILE_NAME)
-        if not os.path.exists(flow_file):
-            raise IOError("Groundwater flow file not generated! Please check <pycomus.ComusOutputPars>!")
-        _period = {}
-        for i in range(len(self._periods)):
-            if self._model.package[CONSTANTS.OUT_PKG_NAME].cell_flo == 1:
-                _period[i + 1] = self._periods[i][1]
+        self._check_target(CONSTANTS.CELLFL_FILE_NAME, tar_period, tar_iter, tar_layer)
+        names = self._index.names(CONSTANTS.CELLFL_FILE_NAME)
+        flows = []
+        for name in FLOW_RECORD_NAMES:
+            if name in names:
+                flows.append(self._read_layer(CONSTANTS.CELLFL_FILE_NAME, tar_period, tar_iter, tar_layer, name))
             else:
-                _period[i + 1] = 1
-        if tar_layer < 0 or tar_layer >= self._num_lyr:
-            raise ValueError(f"tar_layer should be greater than or equal to 0, and less than {self._num_lyr}.")
-        if tar_period < 0 or tar_period >= len(self._periods):
-            raise ValueError(f"tar_period should be greater than or equal to 0, and less than {len(self._periods)}")
-        if self._model.package[CONSTANTS.OUT_PKG_NAME].cell_flo == 1:
-            iter = _period[tar_period + 1]
-            if tar_iter < 0 or tar_iter >= iter:
-                raise ValueError(f"tar_period should be greater than or equal to 0, and less than {iter}")
-
-        layer_count = self._num_row * self._num_col * 4
-        all_layer_count = layer_count * self._num_lyr
-        all_dir_count = (all_layer_count + 36) * 3
-        flow_x = np.zeros((self._num_row, self._num_col))
-        flow_y = np.zeros((self._num_row, self._num_col))
-        flow_z = np.zeros((self._num_row, self._num_col))
-        with open(flow_file, "rb") as file:
-            for period, iter in _period.items():
-                if (period - 1) != tar_period:
-                    file.seek(all_dir_count * iter, 1)
-                    continue
-                for it in range(1, iter + 1):
-                    if it - 1 != tar_iter:
-                        file.seek(all_dir_count, 1)
-                        continue
-                    for dir in range(3):
-                        file.read(36)
-                        for layer in range(self._num_lyr):
-                            if layer != tar_layer:
-                                file.seek(layer_count, 1)
-                                continue
-                            for row in range(self._num_row):
-                                for col in range(self._num_col):
-                                    if dir == 0:
-                                        flow_x[row][col] = struct.unpack('f', file.read(4))[0]
-                                    elif dir == 1:
-                                        flow_y[row][col] = struct.unpack('f', file.read(4))[0]
-                                    else:
-                                        flow_z[row][col] = struct.unpack('f', file.read(4))[0]
-        return (flow_x, flow_y, flow_z)
+                flows.append(np.zeros((self._num_row, self._num_col)))
+        return (flows[0], flows[1], flows[2])
 
     def read_cell_bd(self, tar_period: int = 0, tar_iter: int = 0, tar_layer: int = 0) -> Dict:
         """
@@ -222,101 +193,455 @@ class ComusData:
         :param tar_layer: int
         :return: Dict
         """
-        bd_file = os.path.join(self._model_path, CONSTANTS.CELLHH_FILE_NAME)
-        if not os.path.exists(bd_file):
-            raise IOError("Groundwater balance file not generated! Please check <pycomus.ComusOutputPars>!")
-        bd_size = self._get_bd_size()
-        _period = {}
-        for i in range(len(self._periods)):
-            if self._model.package[CONSTANTS.OUT_PKG_NAME].cell_flo == 1:
-                _period[i + 1] = self._periods[i][1]
-            else:
-                _period[i + 1] = 1
+        self._check_target(CONSTANTS.CELLBD_FILE_NAME, tar_period, tar_iter, tar_layer)
+        res = {}
+        for name in self._index.names(CONSTANTS.CELLBD_FILE_NAME):
+            res[name] = self._read_layer(CONSTANTS.CELLBD_FILE_NAME, tar_period, tar_iter, tar_layer, name)
+        return res
+
+    def read_bd(self, tar_period: int = 0, tar_iter: int = 0) -> Dict[str, np.ndarray]:
+        """
+        Read the groundwater balance of every layer for a specific stress period and a certain simulation time frame.
+
+        All balance terms of the time step are read with a single file read.
+
+        :param tar_period: int
+        :param tar_iter: int
+        :return: Dict[str, np.ndarray]
+            Balance term name -> array of shape (num_lyr, num_row, num_col).
+        """
+        self._check_target(CONSTANTS.CELLBD_FILE_NAME, tar_period, tar_iter, 0)
+        names = self._index.names(CONSTANTS.CELLBD_FILE_NAME)
+        offset = self._index.offset(CONSTANTS.CELLBD_FILE_NAME, tar_period, tar_iter, 0, names[0])
+        with open(os.path.join(self._model_path, CONSTANTS.CELLBD_FILE_NAME), "rb") as file:
+            file.seek(offset - OutLayout.header_size(CONSTANTS.CELLBD_FILE_NAME))
+            records = OutLayout.read_records(file, CONSTANTS.CELLBD_FILE_NAME, self._shape, len(names))
+        return {name: records["data"][i].astype(float) for i, name in enumerate(names)}
+
+    def iter_heads(self, layers: Union[int, slice, List[int], None] = None) -> Iterator[
+        Tuple[int, int, float, np.ndarray]]:
+        """
+        Iterate over the groundwater levels of every output time step while keeping only one time step in memory.
+
+        The yielded array is a float32 buffer that is reused and overwritten by the next time step, copy it to keep
+        the data.
+
+        :param layers: int, slice or List[int], by default all layers
+        :return: Iterator[Tuple[int, int, float, np.ndarray]]
+            (period, step, time, levels) with levels of shape (n_layers, num_row, num_col), the layer axis is
+            dropped when layers is an int.
+        """
+        for period, step, time, data in self._iter_steps(CONSTANTS.CELLHH_FILE_NAME, layers):
+            yield period, step, time, data["HEAD"]
+
+    def iter_dropdowns(self, layers: Union[int, slice, List[int], None] = None) -> Iterator[
+        Tuple[int, int, float, np.ndarray]]:
+        """
+        Iterate over the groundwater dropdown of every output time step while keeping only one time step in memory.
+
+        The yielded array is a float32 buffer that is reused and overwritten by the next time step, copy it to keep
+        the data.
+
+        :param layers: int, slice or List[int], by default all layers
+        :return: Iterator[Tuple[int, int, float, np.ndarray]]
+            (period, step, time, dropdown) with dropdown of shape (n_layers, num_row, num_col), the layer axis is
+            dropped when layers is an int.
+        """
+        for period, step, time, data in self._iter_steps(CONSTANTS.CELLDD_FILE_NAME, layers):
+            yield period, step, time, data["DRAWDOWN"]
+
+    def iter_flos(self, layers: Union[int, slice, List[int], None] = None) -> Iterator[
+        Tuple[int, int, float, Tuple[np.ndarray, np.ndarray, np.ndarray]]]:
+        """
+        Iterate over the groundwater flow of every output time step while keeping only one time step in memory.
+
+        The yielded arrays are float32 buffers that are reused and overwritten by the next time step, copy them to
+        keep the data.
+
+        :param layers: int, slice or List[int], by default all layers
+        :return: Iterator[Tuple[int, int, float, Tuple[np.ndarray, np.ndarray, np.ndarray]]]
+            (period, step, time, (flow_x, flow_y, flow_z)) with flows of shape (n_layers, num_row, num_col), the
+            layer axis is dropped when layers is an int.
+        """
+        zeros = None
+        for period, step, time, data in self._iter_steps(CONSTANTS.CELLFL_FILE_NAME, layers):
+            if zeros is None:
+                zeros = np.zeros_like(next(iter(data.values())))
+            flow_x, flow_y, flow_z = (data.get(name, zeros) for name in FLOW_RECORD_NAMES)
+            yield period, step, time, (flow_x, flow_y, flow_z)
+
+    def iter_bds(self, layers: Union[int, slice, List[int], None] = None) -> Iterator[Tuple[int, int, float, Dict]]:
+        """
+        Iterate over the groundwater balance of every output time step while keeping only one time step in memory.
+
+        The yielded arrays are float32 buffers that are reused and overwritten by the next time step, copy them to
+        keep the data.
+
+        :param layers: int, slice or List[int], by default all layers
+        :return: Iterator[Tuple[int, int, float, Dict]]
+            (period, step, time, balance) with balance mapping each balance term to an array of shape
+            (n_layers, num_row, num_col), the layer axis is dropped when layers is an int.
+        """
+        for period, step, time, data in self._iter_steps(CONSTANTS.CELLBD_FILE_NAME, layers):
+            yield period, step, time, data
+
+    def follow_heads(self, layers: Union[int, slice, List[int], None] = None, poll_interval: float = 1.0,
+                     timeout: Union[float, None] = None) -> Iterator[Tuple[int, int, float, np.ndarray]]:
+        """
+        Follow the groundwater level file while COMUS is running and yield every output time step as soon as all of
+        its layer records are completely written.
+
+        The file is polled every `poll_interval` seconds, records that are only partly written are left until the
+        next poll. Following ends after the last output time step set by `pycomus.ComusOutputPars` (every time step
+        or every stress period), or when the file has not grown for `timeout` seconds. If the file is recreated by a
+        new run, following starts again from its first record. Start following after the run has started, otherwise
+        the file of the previous run may be read first.
+
+        The yielded array is a float32 buffer that is reused and overwritten by the next time step, copy it to keep
+        the data.
+
+        :param layers: int, slice or List[int], by default all layers
+        :param poll_interval: float
+            Seconds between two checks of the file size.
+        :param timeout: float, by default wait until the last output time step
+        :return: Iterator[Tuple[int, int, float, np.ndarray]]
+            (period, step, time, levels) with levels of shape (n_layers, num_row, num_col), the layer axis is
+            dropped when layers is an int.
+
+        Example:
+        --------
+        >>> run = threading.Thread(target=model1.run)
+        >>> run.start()
+        >>> for period, step, time, head in data.follow_heads(layers=0, timeout=60):
+        ...     print(period, step, time, head.mean())
+        """
+        if poll_interval <= 0:
+            raise ValueError("poll_interval should be greater than 0.")
+        head_file = os.path.join(self._model_path, CONSTANTS.CELLHH_FILE_NAME)
+        layer_idx = self._select(layers, self._num_lyr, "layer")
+        if isinstance(layers, (int, np.integer)):
+            layer_idx = layer_idx[0]
+        buffer = np.zeros(self._num_lyr, dtype=OutLayout.record_dtype(CONSTANTS.CELLHH_FILE_NAME, *self._shape))
+        out = np.zeros(np.shape(np.zeros(self._num_lyr)[layer_idx]) + (self._num_row, self._num_col),
+                       dtype=np.float32)
+        num_steps = self._num_output_steps(self._package[CONSTANTS.OUT_PKG_NAME].cell_hh) \
+            if CONSTANTS.OUT_PKG_NAME in self._package else None
+        position, count, last_step = 0, 0, {}
+        last_change = time.monotonic()
+        while num_steps is None or count < num_steps:
+            size = os.path.getsize(head_file) if os.path.exists(head_file) else 0
+            if size < position:
+                position, count, last_step = 0, 0, {}
+            if size - position < buffer.nbytes:
+                if timeout is not None and time.monotonic() - last_change > timeout:
+                    return
+                time.sleep(poll_interval)
+                continue
+            with open(head_file, "rb") as file:
+                file.seek(position)
+                while size - position >= buffer.nbytes and (num_steps is None or count < num_steps):
+                    file.readinto(buffer)
+                    if np.any(buffer["ilay"] != np.arange(1, self._num_lyr + 1)) or \
+                            np.any(buffer["kper"] != buffer["kper"][0]) or np.any(buffer["kstp"] != buffer["kstp"][0]):
+                        raise IOError(f"{CONSTANTS.CELLHH_FILE_NAME} does not store the layers of each output time "
+                                      f"step contiguously.")
+                    period, kstp = int(buffer["kper"][0]) - 1, int(buffer["kstp"][0])
+                    if period not in last_step:
+                        last_step[period] = [kstp, 0]
+                    elif last_step[period][0] != kstp:
+                        last_step[period] = [kstp, last_step[period][1] + 1]
+                    position += buffer.nbytes
+                    count += 1
+                    np.take(buffer["data"], layer_idx, axis=0, out=out)
+                    yield period, last_step[period][1], float(buffer["totim"][0]), out
+            last_change = time.monotonic()
+
+    def read_head_timeseries(self, cells: Union[List[Tuple[int, int, int]], np.ndarray]) -> Tuple[
+        np.ndarray, np.ndarray]:
+        """
+        Read groundwater levels of several grid cells for every output time step of every stress period.
+
+        :param cells: List[Tuple[int, int, int]] or np.ndarray with shape (n_cells, 3)
+            (layer, row, col) of each grid cell.
+        :return: Tuple[np.ndarray, np.ndarray]
+            Simulation time of each output time step with shape (n_steps,) and the levels with shape
+            (n_steps, n_cells).
+        """
+        return self._read_timeseries(CONSTANTS.CELLHH_FILE_NAME, "HEAD", cells)
+
+    def read_dropdown_timeseries(self, cells: Union[List[Tuple[int, int, int]], np.ndarray]) -> Tuple[
+        np.ndarray, np.ndarray]:
+        """
+        Read groundwater dropdown of several grid cells for every output time step of every stress period.
+
+        :param cells: List[Tuple[int, int, int]] or np.ndarray with shape (n_cells, 3)
+            (layer, row, col) of each grid cell.
+        :return: Tuple[np.ndarray, np.ndarray]
+            Simulation time of each output time step with shape (n_steps,) and the dropdown with shape
+            (n_steps, n_cells).
+        """
+        return self._read_timeseries(CONSTANTS.CELLDD_FILE_NAME, "DRAWDOWN", cells)
+
+    def read_flo_timeseries(self, cells: Union[List[Tuple[int, int, int]], np.ndarray]) -> Tuple[
+        np.ndarray, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Read groundwater flow of several grid cells in the x, y and z directions for every output time step of
+        every stress period.
+
+        :param cells: List[Tuple[int, int, int]] or np.ndarray with shape (n_cells, 3)
+            (layer, row, col) of each grid cell.
+        :return: Tuple[np.ndarray, Tuple[np.ndarray, np.ndarray, np.ndarray]]
+            Simulation time of each output time step with shape (n_steps,) and the flow of each direction with
+            shape (n_steps, n_cells).
+        """
+        names = self._index.names(CONSTANTS.CELLFL_FILE_NAME)
+        times = None
+        flows = {}
+        for name in FLOW_RECORD_NAMES:
+            if name in names:
+                times, flows[name] = self._read_timeseries(CONSTANTS.CELLFL_FILE_NAME, name, cells)
+        if not flows:
+            raise IOError("Groundwater flow file does not contain any flow record!")
+        shape = next(iter(flows.values())).shape
+        flow_x, flow_y, flow_z = (flows.get(name, np.zeros(shape)) for name in FLOW_RECORD_NAMES)
+        return times, (flow_x, flow_y, flow_z)
+
+    def read_heads(self, period: Union[int, slice, List[int], None] = None,
+                   step: Union[int, slice, List[int], None] = None,
+                   layer: Union[int, slice, List[int], None] = None) -> np.ndarray:
+        """
+        Read groundwater levels of several stress periods, time steps and layers at once.
+
+        :param period: int, slice or List[int], by default all stress periods
+        :param step: int, slice or List[int], applied to the output time steps of each selected stress period,
+            by default all time steps
+        :param layer: int, slice or List[int], by default all layers
+        :return: np.ndarray
+            Levels with shape (n_steps, n_layers, num_row, num_col) in simulation order, the layer axis is dropped
+            when layer is an int.
+        """
+        return self._read_layer_blocks(CONSTANTS.CELLHH_FILE_NAME, "HEAD", period, step, layer)
+
+    def read_dropdowns(self, period: Union[int, slice, List[int], None] = None,
+                       step: Union[int, slice, List[int], None] = None,
+                       layer: Union[int, slice, List[int], None] = None) -> np.ndarray:
+        """
+        Read groundwater dropdown of several stress periods, time steps and layers at once.
+
+        :param period: int, slice or List[int], by default all stress periods
+        :param step: int, slice or List[int], applied to the output time steps of each selected stress period,
+            by default all time steps
+        :param layer: int, slice or List[int], by default all layers
+        :return: np.ndarray
+            Dropdown with shape (n_steps, n_layers, num_row, num_col) in simulation order, the layer axis is dropped
+            when layer is an int.
+        """
+        return self._read_layer_blocks(CONSTANTS.CELLDD_FILE_NAME, "DRAWDOWN", period, step, layer)
+
+    def read_flos(self, period: Union[int, slice, List[int], None] = None,
+                  step: Union[int, slice, List[int], None] = None,
+                  layer: Union[int, slice, List[int], None] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Read groundwater flow in the x, y and z directions of several stress periods, time steps and layers at once.
+
+        :param period: int, slice or List[int], by default all stress periods
+        :param step: int, slice or List[int], applied to the output time steps of each selected stress period,
+            by default all time steps
+        :param layer: int, slice or List[int], by default all layers
+        :return: Tuple[np.ndarray, np.ndarray, np.ndarray]
+            Flow of each direction with shape (n_steps, n_layers, num_row, num_col) in simulation order, the layer
+            axis is dropped when layer is an int.
+        """
+        file_name = CONSTANTS.CELLFL_FILE_NAME
+        names = self._index.names(file_name)
+        if not names:
+            raise IOError("Groundwater flow file does not contain any flow record!")
+        offsets = self._select_steps(file_name, names[0], period, step)
+        layers = self._select(layer, self._num_lyr, "layer")
+        flows = {name: np.zeros((len(offsets), layers.size, self._num_row, self._num_col)) for name in
+                 FLOW_RECORD_NAMES}
+        with open(os.path.join(self._model_path, file_name), "rb") as file:
+            for i, step_offsets in enumerate(offsets):
+                # All flow directions of a time step are stored one after another
+                file.seek(step_offsets[0] - OutLayout.header_size(file_name))
+                records = OutLayout.read_records(file, file_name, self._shape, len(names))
+                for record in records:
+                    text = record["text"].decode("utf-8").strip()
+                    if text in flows:
+                        flows[text][i] = record["data"][layers]
+        flow_x, flow_y, flow_z = (flows[name][:, 0] if isinstance(layer, (int, np.integer)) else flows[name]
+                                  for name in FLOW_RECORD_NAMES)
+        return flow_x, flow_y, flow_z
+
+    def export(self, path: str, archive_format: str = "npz"):
+        """
+        Convert the groundwater levels, dropdown, flow and balance of every output time step into a chunked
+        compressed archive that can be read lazily with `pycomus.ComusArchive`.
+
+        Every (time step, layer) of a record is stored as one compressed chunk, together with the stress period,
+        time step and simulation time of each output time step. Output files that were not generated are skipped.
+
+        :param path: str
+            Archive file to create, an existing file is overwritten.
+        :param archive_format: str
+            "npz" (no extra dependency) or "hdf5" (requires h5py).
+        """
+        groups = {}
+        for group, file_name in ARCHIVE_GROUPS.items():
+            if os.path.exists(os.path.join(self._model_path, file_name)):
+                groups[group] = (self._index.names(file_name), self._iter_steps(file_name, None))
+        if not groups:
+            raise IOError("No COMUS cell output file was generated! Please check <pycomus.ComusOutputPars>!")
+        write_archive(path, groups, (self._num_lyr, self._num_row, self._num_col), archive_format)
+
+    def cache_info(self) -> CacheInfo:
+        """
+        Hit/miss counters and memory use of the cache of decoded layers.
+
+        :return: CacheInfo
+        """
+        return self._cache.info()
+
+    def clear_cache(self):
+        """
+        Drop every cached layer and reset the cache counters.
+        """
+        self._cache.clear()
+
+    def _check_target(self, file_name: str, tar_period: int, tar_iter: int, tar_layer: int):
         if tar_layer < 0 or tar_layer >= self._num_lyr:
             raise ValueError(f"tar_layer should be greater than or equal to 0, and less than {self._num_lyr}.")
         if tar_period < 0 or tar_period >= len(self._periods):
             raise ValueError(f"tar_period should be greater than or equal to 0, and less than {len(self._periods)}")
-        if self._model.package[CONSTANTS.OUT_PKG_NAME].cell_flo == 1:
-            iter = _period[tar_period + 1]
-            if tar_iter < 0 or tar_iter >= iter:
-                raise ValueError(f"tar_period should be greater than or equal to 0, and less than {iter}")
-
-        layer_count = self._num_row * self._num_col * 4
-        all_layer_count = layer_count * self._num_lyr
-        all_dir_count = (all_layer_count + 36) * bd_size
-        res = {}
-        with open(bd_file, "rb") as file:
-            for period, iter in _period.items():
-                if (period - 1) != tar_period:
-                    file.seek(all_dir_count * iter, 1)
-                    continue
-                for it in range(1, iter + 1):
-                    if it - 1 != tar_iter:
-                        file.seek(all_dir_count, 1)
-                        continue
-                    for bd in range(bd_size):
-                        file.read(8)
-                        description = struct.unpack('16s', file.read(16))[0].decode('utf-8').strip()
-                        file.read(12)
-                        for layer in range(self._num_lyr):
-                            if layer != tar_layer:
-                                file.seek(layer_count, 1)
-                                continue
-                            for row in range(self._num_row):
-                                for col in range(self._num_col):
-                                    if description not in res:
-                                        res[description] = np.zeros((self._num_row, self._num_col))
-                                    res[description][row][col] = struct.unpack('f', file.read(4))[0]
-        return res
+        iter = self._index.num_steps(file_name, tar_period)
+        if tar_iter < 0 or tar_iter >= iter:
+            raise ValueError(f"tar_iter should be greater than or equal to 0, and less than {iter}")
+
+    def _read_layer(self, file_name: str, tar_period: int, tar_iter: int, tar_layer: int, name: str) -> np.ndarray:
+        key = (file_name, self._index.version(file_name), tar_period, tar_iter, tar_layer, name)
+        data = self._cache.get(key)
+        if data is None:
+            offset = self._index.offset(file_name, tar_period, tar_iter, tar_layer, name)
+            data = OutLayout.read_layer(os.path.join(self._model_path, file_name), offset, self._num_row,
+                                        self._num_col).astype(float)
+            self._cache.put(key, data)
+        return data.copy()
+
+    def _read_layer_blocks(self, file_name: str, name: str, period: Union[int, slice, List[int], None],
+                           step: Union[int, slice, List[int], None],
+                           layer: Union[int, slice, List[int], None]) -> np.ndarray:
+        offsets = self._select_steps(file_name, name, period, step)
+        layers = self._select(layer, self._num_lyr, "layer")
+        res = np.zeros((len(offsets), layers.size, self._num_row, self._num_col))
+        with open(os.path.join(self._model_path, file_name), "rb") as file:
+            for i, step_offsets in enumerate(offsets):
+                # The layer records of a time step are stored one after another
+                file.seek(step_offsets[0] - OutLayout.header_size(file_name))
+                records = OutLayout.read_records(file, file_name, self._shape, self._num_lyr)
+                if np.any(records["ilay"] != np.arange(1, self._num_lyr + 1)):
+                    raise IOError(f"{file_name} does not store the layers of each output time step contiguously.")
+                res[i] = records["data"][layers]
+        return res[:, 0] if isinstance(layer, (int, np.integer)) else res
+
+    def _iter_steps(self, file_name: str, layers: Union[int, slice, List[int], None]) -> Iterator[
+        Tuple[int, int, float, Dict[str, np.ndarray]]]:
+        names = self._index.names(file_name)
+        if not names:
+            return
+        periods, steps, times, offsets = self._step_table(file_name, names[0])
+        layer_idx = self._select(layers, self._num_lyr, "layer")
+        if isinstance(layers, (int, np.integer)):
+            layer_idx = layer_idx[0]
+        layer_record = OutLayout.get_layout(file_name).layer_record
+        buffer = np.zeros(self._num_lyr if layer_record else len(names),
+                          dtype=OutLayout.record_dtype(file_name, *self._shape))
+        out_shape = np.shape(np.zeros(self._num_lyr)[layer_idx]) + (self._num_row, self._num_col)
+        out = {name: np.zeros(out_shape, dtype=np.float32) for name in names}
+        with open(os.path.join(self._model_path, file_name), "rb") as file:
+            for period, step, time, step_offsets in zip(periods, steps, times, offsets):
+                file.seek(step_offsets[0] - OutLayout.header_size(file_name))
+                if file.readinto(buffer) != buffer.nbytes:
+                    raise IOError(f"{file_name} is incomplete.")
+                if layer_record:
+                    np.take(buffer["data"], layer_idx, axis=0, out=out[names[0]])
+                else:
+                    for i, name in enumerate(names):
+                        np.take(buffer["data"][i], layer_idx, axis=0, out=out[name])
+                yield int(period), int(step), float(time), out
+
+    def _read_timeseries(self, file_name: str, name: str, cells: Union[List[Tuple[int, int, int]], np.ndarray]) -> \
+            Tuple[np.ndarray, np.ndarray]:
+        cells = np.asarray(cells, dtype=np.int64).reshape(-1, 3)
+        for axis, (axis_name, size) in enumerate(zip(("layer", "row", "col"),
+                                                     (self._num_lyr, self._num_row, self._num_col))):
+            if np.any(cells[:, axis] < 0) or np.any(cells[:, axis] >= size):
+                raise ValueError(
+                    f"The {axis_name} of cells should be greater than or equal to 0, and less than {size}.")
+        _, _, times, offsets = self._step_table(file_name, name)
+        if times.size == 0:
+            return times, np.zeros((0, cells.shape[0]))
+        records = OutLayout.map_records(os.path.join(self._model_path, file_name), file_name, self._shape)
+        # Record of every (time step, cell) pair, from the data offsets of the index
+        header_size = OutLayout.header_size(file_name)
+        if OutLayout.get_layout(file_name).layer_record:
+            record_ids = (offsets[:, cells[:, 0]] - header_size) // records.dtype.itemsize
+            values = records["data"][record_ids, cells[:, 1], cells[:, 2]]
+        else:
+            record_ids = (offsets[:, :1] - header_size) // records.dtype.itemsize
+            values = records["data"][record_ids, cells[:, 0], cells[:, 1], cells[:, 2]]
+        return times, values.astype(float)
+
+    def _step_table(self, file_name: str, name: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        # Stress period, output time step, simulation time and per-layer data offset of each output time step
+        entries = self._index.entries(file_name)
+        entries = entries[entries["name"] == name.encode("utf-8")]
+        steps, step_ids = np.unique(entries["period"].astype(np.int64) * (1 << 32) + entries["step"],
+                                    return_inverse=True)
+        offsets = np.full((steps.size, self._num_lyr), -1, dtype=np.int64)
+        offsets[step_ids, entries["layer"]] = entries["offset"]
+        if np.any(offsets < 0):
+            raise IOError(f"{file_name} does not contain every layer of each output time step.")
+        first = np.unique(step_ids, return_index=True)[1]
+        periods = entries["period"][first]
+        times = self._step_times(periods, entries["kstp"][first], entries["totim"][first])
+        return periods, entries["step"][first], times, offsets
+
+    def _select_steps(self, file_name: str, name: str, period: Union[int, slice, List[int], None],
+                      step: Union[int, slice, List[int], None]) -> np.ndarray:
+        periods, steps, _, offsets = self._step_table(file_name, name)
+        selected = np.zeros(periods.size, dtype=bool)
+        for tar_period in self._select(period, len(self._periods), "period"):
+            in_period = np.flatnonzero(periods == tar_period)
+            selected[in_period[self._select(step, in_period.size, "step")]] = True
+        return offsets[selected]
+
+    @staticmethod
+    def _select(selector: Union[int, slice, List[int], None], size: int, axis_name: str) -> np.ndarray:
+        if selector is None:
+            return np.arange(size)
+        try:
+            return np.atleast_1d(np.arange(size)[selector])
+        except IndexError:
+            raise ValueError(f"{axis_name} {selector} is out of range, there are {size} {axis_name}s.")
+
+    def _step_times(self, periods: np.ndarray, kstps: np.ndarray, totims: np.ndarray) -> np.ndarray:
+        times = np.array(totims, dtype=float)
+        period_start = np.concatenate(([0.0], np.cumsum([float(period[0]) for period in self._periods])))
+        for i in np.flatnonzero(np.isnan(times)):
+            perlen, nstep, multr = (float(x) for x in self._periods[periods[i]])
+            kstp = int(kstps[i])
+            if kstp < 0 or kstp >= nstep:
+                elapsed = perlen
+            elif multr == 1:
+                elapsed = perlen * kstp / nstep
+            else:
+                elapsed = perlen * (multr ** kstp - 1) / (multr ** nstep - 1)
+            times[i] = period_start[periods[i]] + elapsed
+        return times
 
-    def _get_bd_size(self) -> int:
-        bd_size = 0
-        bd_size += 1 if self._cms_par.sim_type == 2 else 0
-        for layer in self._model.layers:
-            for row in range(self._num_row):
-                for col in range(self._num_col):
-                    grid_cell = layer.grid_cells[row][col]
-                    if grid_cell.ibound == -1:
-                        bd_size += 1
-                        break
-        if "RCH" in self._package:
-            bd_size += 1
-        if "GHB" in self._package:
-            bd_size += 1
-        if "DRN" in self._package:
-            bd_size += 1
-        if "SHB" in self._package:
-            bd_size += 1
-        if "WEL" in self._package:
-            bd_size += 1
-        if "EVT" in self._package:
-            bd_size += 1
-        if "RIV" in self._package:
-            bd_size += 1
-        if "STR" in self._package:
-            bd_size += 1
-            stream_value = self._package["STR"]
-            if stream_value.WatUseData:
-                bd_size += 1
-            if stream_value.WatDrnData:
-                bd_size += 1
-        if "RES" in self._package:
-            bd_size += 3
-        if "LAK" in self._package:
-            bd_size += 3
-        if "IBS" in self._package:
-            bd_size += 1
-        if "SUB" in self._package:
-            bd_size += 2
-        return bd_size
-
-    def _layer_block_size(self):
-        size_of_int = 4
-        size_of_float = 4
-        size_of_char = 1
-        block_size = size_of_int * 2 + size_of_float * 2 + (size_of_char * 16) + (size_of_int * 3) + (
-                size_of_float * self._num_row * self._num_col)
-        return block_size
-
-    def _row_block_size(self):
-        return 4 * self._num_col
+    def _num_output_steps(self, out_option: int) -> int:
+        if out_option == 1:
+            return int(sum(int(period[1]) for period in self._periods))
+        if out_option == 2:
+            return len(self._periods)
+        raise IOError("The output is not generated! Please check <pycomus.ComusOutputPars>!")
@@ -0,0 +1,246 @@
+# --------------------------------------------------------------
+# ResultCache.py
+# Version: 1.0.0
+# Author: Zhenjiang Wu
+# Description: Local Store Of COMUS Simulation Results Keyed By A Fingerprint Of The Model Input.
+# --------------------------------------------------------------
+import os
+import shutil
+import tempfile
+from typing import Dict, Tuple
+
+from pycomus.Utils import CONSTANTS
+from pycomus.Utils.SolverProcess import solver_library
+from pycomus.Utils.WriteManifest import content_digest, file_digest, load_manifest
+
+# Content hash of every solver library file, keyed by (path, size, modification time)
+_solver_digests: Dict[Tuple[str, int, int], str] = {}
+
+
+def solver_digest() -> str:
+    """
+    Content hash of the COMUS solver library of this system.
+
+    :return: str
+    """
+    path = solver_library()
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    if key not in _solver_digests:
+        _solver_digests[key] = file_digest(path)
+    return _solver_digests[key]
+
+
+def model_fingerprint(model) -> str:
+    """
+    Deterministic fingerprint of the simulation input of a model: the arrays and settings of every package, the
+    layers, the grid cell parameters and the float format of the input files, together with the solver library.
+    The model name and workspace are not part of it, models that differ only in them have the same fingerprint.
+
+    :param model: pycomus.ComusModel
+    :return: str
+    """
+    return content_digest(model.float_format, sorted(model.package.items()), model.layers, model.grid_arrays,
+                          solver_digest())
+
+
+def input_fingerprint(model_path: str) -> str:
+    """
+    Deterministic fingerprint of the input files written in the <Data.in> folder of a model, together with the
+    solver library. This is the input the solver reads, unlike `model_fingerprint` it does not change until the
+    files are written again. Files whose size and modification time are as recorded in <Data.in.manifest> (see
+    `ComusModel.write_files`) take their content hash from it, the others are hashed.
+
+    :param model_path: str
+        Model folder, which holds <Data.in>.
+    :return: str
+    """
+    folder_path = os.path.join(model_path, "Data.in")
+    if not os.path.isdir(folder_path):
+        raise ValueError(f"<{folder_path}> does not exist, the model files need to be written first.")
+    recorded = {}
+    for entry in load_manifest(os.path.join(model_path, CONSTANTS.IN_MANIFEST_FILE_NAME)).values():
+        recorded.update(entry.get("files", {}))
+    digests = []
+    for file_name in sorted(os.listdir(folder_path)):
+        path = os.path.join(folder_path, file_name)
+        if not os.path.isfile(path):
+            continue
+        stat = os.stat(path)
+        known = recorded.get(file_name)
+        if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            digests.append((file_name, known["digest"]))
+        else:
+            digests.append((file_name, file_digest(path)))
+    return content_digest(digests, solver_digest())
+
+
+def output_complete(model, out_path: str) -> bool:
+    """
+    True if the <Data.out> folder `out_path` holds every grid cell output file that the output control options of
+    the model ask for, each not empty.
+
+    :param model: pycomus.ComusModel
+    :param out_path: str
+    :return: bool
+    """
+    out_pars = model.package[CONSTANTS.OUT_PKG_NAME]
+    expected = {CONSTANTS.CELLHH_FILE_NAME: out_pars.cell_hh, CONSTANTS.CELLDD_FILE_NAME: out_pars.cell_dd,
+                CONSTANTS.CELLFL_FILE_NAME: out_pars.cell_flo, CONSTANTS.CELLBD_FILE_NAME: out_pars.cell_bd}
+    for file_name, option in expected.items():
+        path = os.path.join(out_path, file_name)
+        if option != 0 and not (os.path.isfile(path) and os.path.getsize(path) > 0):
+            return False
+    return True
+
+
+class ComusResultCache:
+    """
+    Local store of COMUS simulation results. The <Data.out> folder of a run is kept under the fingerprint of the
+    written model input (see `input_fingerprint`), and a model with the same fingerprint gets a copy of it instead
+    of being run again. When the stored results exceed `max_bytes`, the least recently used results are evicted.
+
+    Attributes:
+    ----------------------------
+    path: str
+        Folder of the store, every result is in a sub folder named by its fingerprint.
+    max_bytes: int
+        Byte budget of the stored results.
+
+    Methods:
+    --------
+    __init__(self, path: str, max_bytes: int = 1 << 30)
+        Open or create a result store.
+
+    get(self, fingerprint: str, out_path: str) -> bool
+        Copy a stored result into a <Data.out> folder.
+
+    put(self, fingerprint: str, out_path: str) -> bool
+        Store the result in a <Data.out> folder.
+
+    size(self) -> int
+        Bytes of the stored results.
+
+    clear(self)
+        Remove every stored result.
+
+    Returns:
+    --------
+    instance: pycomus.ComusResultCache
+
+    Example:
+    --------
+    >>> import pycomus
+    >>> cache = pycomus.ComusResultCache("./results", max_bytes=10 << 30)
+    >>> model.write_files()
+    >>> model.run(cache=cache)
+    """
+
+    def __init__(self, path: str, max_bytes: int = 1 << 30):
+        if not isinstance(path, str):
+            raise ValueError("path should be of type str.")
+        if not isinstance(max_bytes, int) or max_bytes < 0:
+            raise ValueError("max_bytes should be an int greater than or equal to 0.")
+        self.path: str = os.path.abspath(path)
+        self.max_bytes: int = max_bytes
+        os.makedirs(self.path, exist_ok=True)
+
+    def __contains__(self, fingerprint: str) -> bool:
+        return os.path.isdir(os.path.join(self.path, fingerprint))
+
+    def get(self, fingerprint: str, out_path: str) -> bool:
+        """
+        Replace the <Data.out> folder `out_path` with a copy of the result stored under `fingerprint`.
+
+        :param fingerprint: str
+        :param out_path: str
+        :return: bool
+            False if no result is stored under `fingerprint`.
+        """
+        entry = os.path.join(self.path, fingerprint)
+        if not os.path.isdir(entry):
+            return False
+        temp_path = tempfile.mkdtemp(prefix=".Data.out.", dir=os.path.dirname(os.path.abspath(out_path)))
+        try:
+            for file_name in os.listdir(entry):
+                shutil.copyfile(os.path.join(entry, file_name), os.path.join(temp_path, file_name))
+        except FileNotFoundError:
+            # Evicted by another process while it was copied
+            shutil.rmtree(temp_path, ignore_errors=True)
+            return False
+        shutil.rmtree(out_path, ignore_errors=True)
+        os.replace(temp_path, out_path)
+        os.utime(entry)
+        return True
+
+    def put(self, fingerprint: str, out_path: str) -> bool:
+        """
+        Store a copy of the <Data.out> folder `out_path` under `fingerprint` and evict the least recently used
+        results beyond the byte budget.
+
+        :param fingerprint: str
+        :param out_path: str
+        :return: bool
+            False if the result is larger than the byte budget and was not stored.
+        """
+        file_names = [file_name for file_name in os.listdir(out_path)
+                      if os.path.isfile(os.path.join(out_path, file_name))]
+        if sum(os.path.getsize(os.path.join(out_path, file_name)) for file_name in file_names) > self.max_bytes:
+            return False
+        entry = os.path.join(self.path, fingerprint)
+        temp_path = tempfile.mkdtemp(prefix=f".{fingerprint}.", dir=self.path)
+        try:
+            for file_name in file_names:
+                shutil.copyfile(os.path.join(out_path, file_name), os.path.join(temp_path, file_name))
+            if os.path.isdir(entry):
+                shutil.rmtree(entry, ignore_errors=True)
+            os.replace(temp_path, entry)
+        except OSError:
+            # Stored by another process meanwhile
+            shutil.rmtree(temp_path, ignore_errors=True)
+        self._evict()
+        return True
+
+    def size(self) -> int:
+        """
+        Bytes of the stored results.
+
+        :return: int
+        """
+        return sum(size for _, _, size in self._entries())
+
+    def clear(self):
+        """
+        Remove every stored result.
+
+        """
+        for entry, _, _ in self._entries():
+            shutil.rmtree(entry, ignore_errors=True)
+
+    def _entries(self):
+        res = []
+        for name in os.listdir(self.path):
+            entry = os.path.join(self.path, name)
+            if name.startswith(".") or not os.path.isdir(entry):
+                continue
+            try:
+                size = sum(item.stat().st_size for item in os.scandir(entry) if item.is_file())
+                res.append((entry, os.stat(entry).st_mtime_ns, size))
+            except FileNotFoundError:
+                continue
+        return res
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda item: item[1])
+        total = sum(size for _, _, size in entries)
+        for entry, _, size in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def __str__(self):
+        return f"ComusResultCache:\n    Path: {self.path}\n    Size: {self.size()} / {self.max_bytes} bytes"
+
+    def __repr__(self):
+        return f"ComusResultCache(path='{self.path}', max_bytes={self.max_bytes})"
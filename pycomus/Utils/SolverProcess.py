@@ -0,0 +1,364 @@
+# --------------------------------------------------------------
+# SolverProcess.py
+# Version: 1.0.0
+# Author: Zhenjiang Wu
+# Description: Run The COMUS Solver In This Process Or In A Separate Worker Process And Parse Its Console Output.
+# --------------------------------------------------------------
+# This file is also run as a script by the worker process, so it only imports the standard library.
+import ctypes
+import multiprocessing
+import os
+import platform
+import re
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, NamedTuple, Tuple, Union
+
+_STEP_LINE = re.compile(r"Stress Period:\s*(\d+)\s*##\s*Time Step:\s*(\d+)\s*##\s*Accumulated Duration:\s*(\S+)")
+_ITERATION_LINE = re.compile(r"Iteration\s+(\d+):\s*Maximum Head Change\s*=\s*(\S+)"
+                             r"(?:\s*\[K,I,J\]\s*(\d+)\s+(\d+)\s+(\d+))?")
+_COMPLETED_LINE = "Numerical Groundwater Simulation Calculation Completed!"
+
+
+class StepEvent(NamedTuple):
+    """
+    Solver progress of one time step.
+
+    Attributes:
+    ----------------------------
+    period: int
+        Stress period, 0-based.
+    step: int
+        Time step within the stress period, 0-based.
+    time: float
+        Accumulated simulation time at the end of the time step.
+    iterations: int
+        Number of outer iterations.
+    head_changes: Tuple[float, ...]
+        Maximum head change of every outer iteration.
+    max_head_change: float
+        Maximum head change of the last outer iteration, NaN if the solver reported no iteration.
+    max_head_change_cell: Tuple[int, int, int] or None
+        (layer, row, col) of the maximum head change of the last outer iteration, 0-based.
+    elapsed: float
+        Wall time in seconds spent on the time step, as seen from the console output.
+    """
+    period: int
+    step: int
+    time: float
+    iterations: int
+    head_changes: Tuple[float, ...]
+    max_head_change: float
+    max_head_change_cell: Union[Tuple[int, int, int], None]
+    elapsed: float
+
+
+class RunSummary(NamedTuple):
+    """
+    Solver progress of a whole run.
+
+    Attributes:
+    ----------------------------
+    steps: List[StepEvent]
+        Every time step in simulation order.
+    completed: bool
+        True if the solver reported that the simulation completed.
+
+    Methods:
+    --------
+    iterations(self) -> int
+        Number of outer iterations of the whole run.
+
+    period_iterations(self) -> Dict[int, int]
+        Number of outer iterations of every stress period.
+
+    period_times(self) -> Dict[int, float]
+        Wall time in seconds of every stress period.
+
+    slowest_periods(self, count: int = 5) -> List[Tuple[int, float]]
+        The stress periods that took the most wall time, with their time.
+    """
+    steps: List[StepEvent]
+    completed: bool
+
+    def iterations(self) -> int:
+        """
+        Number of outer iterations of the whole run.
+
+        :return: int
+        """
+        return sum(event.iterations for event in self.steps)
+
+    def period_iterations(self) -> Dict[int, int]:
+        """
+        Number of outer iterations of every stress period.
+
+        :return: Dict[int, int]
+        """
+        res = {}
+        for event in self.steps:
+            res[event.period] = res.get(event.period, 0) + event.iterations
+        return res
+
+    def period_times(self) -> Dict[int, float]:
+        """
+        Wall time in seconds of every stress period.
+
+        :return: Dict[int, float]
+        """
+        res = {}
+        for event in self.steps:
+            res[event.period] = res.get(event.period, 0.0) + event.elapsed
+        return res
+
+    def slowest_periods(self, count: int = 5) -> List[Tuple[int, float]]:
+        """
+        The stress periods that took the most wall time, slowest first, with their wall time in seconds.
+
+        :param count: int
+        :return: List[Tuple[int, float]]
+        """
+        return sorted(self.period_times().items(), key=lambda item: item[1], reverse=True)[:count]
+
+
+class SolverLog:
+    """
+    Parser of the console output of the COMUS solver. Every line is fed as it is printed, and a `StepEvent` is
+    produced when a time step ends, i.e. when the next one starts or the simulation ends.
+
+    Attributes:
+    ----------------------------
+    on_step: Callable[[StepEvent], None] or None
+        Called with every `StepEvent` as soon as it is produced.
+
+    Methods:
+    --------
+    feed(self, line: str, now: Union[float, None] = None) -> Union[StepEvent, None]
+        Parse one line of console output.
+
+    finish(self, now: Union[float, None] = None) -> RunSummary
+        End the output and summarize the run.
+
+    Example:
+    --------
+    >>> log = SolverLog(on_step=print)
+    >>> for line in stdout.splitlines():
+    ...     log.feed(line)
+    >>> summary = log.finish()
+    """
+
+    def __init__(self, on_step: Union[Callable[[StepEvent], None], None] = None):
+        self.on_step: Union[Callable[[StepEvent], None], None] = on_step
+        self._steps: List[StepEvent] = []
+        self._current = None
+        self._changes: List[float] = []
+        self._cell = None
+        self._completed = False
+
+    def feed(self, line: str, now: Union[float, None] = None) -> Union[StepEvent, None]:
+        """
+        Parse one line of console output.
+
+        :param line: str
+        :param now: float or None
+            Time of the line in seconds (`time.perf_counter()`), None uses the current time.
+        :return: StepEvent or None
+            The time step that the line ended.
+        """
+        now = time.perf_counter() if now is None else now
+        match = _ITERATION_LINE.search(line)
+        if match:
+            self._changes.append(float(match.group(2)))
+            self._cell = None if match.group(3) is None else tuple(int(match.group(i)) - 1 for i in (3, 4, 5))
+            return None
+        match = _STEP_LINE.search(line)
+        if match:
+            event = self._end_step(now)
+            self._current = (int(match.group(1)) - 1, int(match.group(2)) - 1, float(match.group(3)), now)
+            return event
+        if _COMPLETED_LINE in line:
+            self._completed = True
+            return self._end_step(now)
+        return None
+
+    def finish(self, now: Union[float, None] = None) -> RunSummary:
+        """
+        End the output and summarize the run.
+
+        :param now: float or None
+            Time of the end of the output in seconds (`time.perf_counter()`), None uses the current time.
+        :return: RunSummary
+        """
+        self._end_step(time.perf_counter() if now is None else now)
+        return RunSummary(list(self._steps), self._completed)
+
+    def _end_step(self, now: float) -> Union[StepEvent, None]:
+        if self._current is None:
+            return None
+        period, step, sim_time, start = self._current
+        event = StepEvent(period, step, sim_time, len(self._changes), tuple(self._changes),
+                          self._changes[-1] if self._changes else float("nan"), self._cell, now - start)
+        self._current = None
+        self._changes = []
+        self._cell = None
+        self._steps.append(event)
+        if self.on_step is not None:
+            self.on_step(event)
+        return event
+
+
+def parse_solver_output(stdout: str) -> RunSummary:
+    """
+    Summarize the console output of a finished COMUS run. The elapsed time of the time steps is not known from
+    the text alone and is 0.
+
+    :param stdout: str
+    :return: RunSummary
+    """
+    log = SolverLog()
+    for line in stdout.splitlines():
+        log.feed(line, now=0.0)
+    return log.finish(now=0.0)
+
+
+class RunResult(NamedTuple):
+    """
+    Result of a COMUS run in a worker process.
+
+    Attributes:
+    ----------------------------
+    exit_code: int
+        Value returned by the solver, negative if the worker process was killed by a signal (e.g. a solver crash).
+    wall_time: float
+        Time in seconds from the start of the worker process to its end.
+    stdout: str
+        Console output of the solver.
+    summary: RunSummary
+        Progress of every time step, parsed from the console output.
+    """
+    exit_code: int
+    wall_time: float
+    stdout: str
+    summary: RunSummary
+
+
+def run_error(result: RunResult) -> Union[str, None]:
+    """
+    Error of a COMUS run that did not complete the simulation, with the last lines of its console output. COMUS
+    also exits with 0 when it rejects its input, only the completion message tells a finished simulation.
+
+    :param result: RunResult
+    :return: str or None
+        None if the simulation completed.
+    """
+    if result.exit_code == 0 and result.summary.completed:
+        return None
+    tail = [line.strip() for line in result.stdout.splitlines() if line.strip()][-5:]
+    return f"COMUS did not complete the simulation (exit code {result.exit_code}): " + " | ".join(tail)
+
+
+def pool_context():
+    """
+    Multiprocessing context of the PyCOMUS worker process pools. Forked workers inherit the models of the parent,
+    other start methods receive them pickled.
+
+    :return: multiprocessing context
+    """
+    return multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else None)
+
+
+def solver_library() -> str:
+    """
+    Path of the COMUS solver library of this system.
+
+    :return: str
+    """
+    system = platform.system()
+    if system == 'Windows':
+        return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'WinComus.dll')
+    elif system == 'Linux':
+        return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'LinuxComus.so')
+    raise ValueError("PyCOMUS only supports Windows and Linux systems.")
+
+
+def run_solver(model_path: str) -> int:
+    """
+    Run the COMUS solver in this process on the model folder that holds <Data.in>.
+
+    :param model_path: str
+    :return: int
+        Value returned by the solver.
+    """
+    comusModel = ctypes.CDLL(solver_library())
+    comusModel.RunModel.restype = ctypes.c_int
+    if platform.system() == 'Windows':
+        comusModel.RunModel.argtypes = [ctypes.c_wchar_p]
+        return comusModel.RunModel(model_path)
+    comusModel.RunModel.argtypes = [ctypes.c_char_p]
+    return comusModel.RunModel(ctypes.c_char_p(model_path.encode('utf-8')))
+
+
+def start_solver(model_path: str, on_step: Union[Callable[[StepEvent], None], None] = None,
+                 on_line: Union[Callable[[str], None], None] = None) -> Future:
+    """
+    Run the COMUS solver in a worker process on the model folder that holds <Data.in>, without waiting for it.
+
+    The solver does not block this interpreter and a solver crash only ends the worker process. Its console output
+    is parsed line by line while it runs, `on_step` is called, from a background thread, with the `StepEvent` of
+    every time step as soon as it ends, and `on_line` with every line of console output as soon as it is printed.
+    The returned future is done when the worker process ends, with its `RunResult`. In an asyncio event loop, await
+    `asyncio.wrap_future(future)`.
+
+    :param model_path: str
+    :param on_step: Callable[[StepEvent], None] or None
+    :param on_line: Callable[[str], None] or None
+    :return: concurrent.futures.Future
+    """
+    solver_library()
+    future = Future()
+    future.set_running_or_notify_cancel()
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, os.path.abspath(__file__), model_path], stdout=subprocess.PIPE,
+                               stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL)
+
+    def wait():
+        try:
+            log = SolverLog(on_step)
+            lines = []
+            for raw in process.stdout:
+                line = raw.decode("utf-8", errors="replace")
+                lines.append(line)
+                # A failing callback must not stop the output from being read
+                if on_line is not None:
+                    try:
+                        on_line(line)
+                    except Exception:
+                        pass
+                try:
+                    log.feed(line)
+                except Exception:
+                    pass
+            process.wait()
+            end = time.perf_counter()
+            future.set_result(RunResult(process.returncode, end - start, "".join(lines), log.finish(end)))
+        except BaseException as error:
+            process.kill()
+            future.set_exception(error)
+
+    threading.Thread(target=wait, name=f"COMUS-{process.pid}", daemon=True).start()
+    return future
+
+
+def _line_buffer_stdout():
+    # The solver prints through C stdio, which fully buffers a pipe, line buffering lets the parent follow it
+    if platform.system() == 'Linux':
+        libc = ctypes.CDLL(None)
+        libc.setvbuf(ctypes.c_void_p.in_dll(libc, "stdout"), None, 1, 0)
+
+
+if __name__ == "__main__":
+    _line_buffer_stdout()
+    sys.exit(run_solver(sys.argv[1]))
@@ -0,0 +1,112 @@
+# --------------------------------------------------------------
+# TextTable.py
+# Version: 1.0.0
+# Author: Zhenjiang Wu
+# Description: Bulk Writer Of Whitespace Separated COMUS Input Tables.
+# --------------------------------------------------------------
+import re
+from typing import List, TextIO, Union
+
+import numpy as np
+
+# Number of rows formatted at once, bounds the memory of the formatted text
+CHUNK_ROWS = 1 << 18
+
+# Float format writing the shortest text that round-trips the value rounded to float32
+FLOAT32_FORMAT = "float32"
+
+# A single printf style float conversion such as "%.8g" or "%12.5E"
+_FLOAT_FORMAT = re.compile(r"%[-+ #0]*\d*(?:\.\d*)?[eEfFgG]")
+
+
+def check_float_format(float_format: Union[str, None]) -> Union[str, None]:
+    """
+    Check the float format of the model input files: None writes the shortest text that round-trips the float64
+    value (as `f"{value}"`), `FLOAT32_FORMAT` the shortest text that round-trips the value rounded to float32, and a
+    printf style float conversion (e, f or g) such as "%.8g" formats every float with it.
+
+    :param float_format: str or None
+    :return: str or None
+    """
+    if float_format is None or float_format == FLOAT32_FORMAT:
+        return float_format
+    if isinstance(float_format, str) and _FLOAT_FORMAT.fullmatch(float_format):
+        return float_format
+    raise ValueError(f"float_format should be None, '{FLOAT32_FORMAT}' or a printf style float conversion (e, f or g) "
+                     f"such as '%.8g'.")
+
+
+def write_table(file: TextIO, columns: List[np.ndarray], chunk_rows: int = CHUNK_ROWS, end: str = "\n",
+                float_format: Union[str, None] = None):
+    """
+    Write equally long 1D columns as rows of values separated by two spaces.
+
+    Every value is written as `f"{value}"` would write it, floats in `float_format` if it is set (see
+    `check_float_format`). The rows are formatted and written in chunks of `chunk_rows` rows.
+
+    :param file: TextIO
+    :param columns: List[np.ndarray]
+    :param chunk_rows: int
+    :param end: str
+        End of every row.
+    :param float_format: str or None
+    """
+    if not columns:
+        return
+    num_rows = columns[0].size
+    if any(column.size != num_rows for column in columns):
+        raise ValueError("All columns of a table should have the same length.")
+    for start in range(0, num_rows, chunk_rows):
+        texts = [format_values(column[start:start + chunk_rows], float_format) for column in columns]
+        file.write(end.join(map("  ".join, zip(*texts))) + end)
+
+
+def format_values(values: np.ndarray, float_format: Union[str, None] = None) -> List[str]:
+    """
+    Text of every value of a 1D array as `f"{value}"` would write it, floats in `float_format` if it is set.
+
+    Repeated values are formatted only once, which makes columns with few distinct values (constants, indices)
+    cheap to format.
+
+    :param values: np.ndarray
+    :param float_format: str or None
+    :return: List[str]
+    """
+    values = np.ascontiguousarray(values)
+    if values.dtype.kind not in "biuf" or values.size == 0:
+        return list(map(str, values.tolist()))
+    if values.dtype.kind != "f":
+        float_format = None
+    # Compare the raw bytes so that e.g. 0.0 and -0.0 keep their own text
+    unique, inverse = np.unique(values.view(f"u{values.dtype.itemsize}"), return_inverse=True)
+    if unique.size * 2 > values.size:
+        return _format_numbers(values, float_format)
+    texts = np.array(_format_numbers(unique.view(values.dtype), float_format), dtype=object)
+    return texts[inverse].tolist()
+
+
+def _format_numbers(values: np.ndarray, float_format: Union[str, None]) -> List[str]:
+    if float_format is None:
+        # tolist() gives Python int/float, which format exactly like the NumPy scalars in an f-string
+        return list(map(str, values.tolist()))
+    if float_format == FLOAT32_FORMAT:
+        with np.errstate(over="ignore"):
+            single = values.astype(np.float32)
+        texts = list(map(str, single))
+        # Values beyond the float32 range (e.g. 1E+100 placeholders) keep their float64 text
+        for i in np.flatnonzero(np.isinf(single) & np.isfinite(values)).tolist():
+            texts[i] = str(values[i].item())
+        return texts
+    return [float_format % value for value in values.tolist()]
+
+
+def grid_index_columns(num_lyr: int, num_row: int, num_col: int) -> List[np.ndarray]:
+    """
+    1-based layer, row and col of every grid cell in layer, row, col order.
+
+    :param num_lyr: int
+    :param num_row: int
+    :param num_col: int
+    :return: List[np.ndarray]
+    """
+    return [index.ravel() + 1 for index in np.indices((num_lyr, num_row, num_col), dtype=np.int32)]
@@ -0,0 +1,209 @@
+# --------------------------------------------------------------
+# WriteManifest.py
+# Version: 1.0.0
+# Author: Zhenjiang Wu
+# Description: Content Hashes Of The Packages And Input Files Written By A COMUS Model.
+# --------------------------------------------------------------
+import hashlib
+import json
+import os
+from typing import Dict, List, NamedTuple, Union
+
+import numpy as np
+
+from pycomus.Utils import CONSTANTS
+
+# Attributes that refer back to the model or hold external handles, they are not part of a package's content
+_SKIP_ATTRS = {"_model", "_CheckLib", "_arrays"}
+
+# Size of the blocks in which input files are hashed
+_FILE_BLOCK = 1 << 20
+
+
+class WriteReport(NamedTuple):
+    """
+    Report of `ComusModel.write_files`.
+
+    Attributes:
+    ----------------------------
+    timings: Dict[str, float]
+        Time in seconds spent writing each written package, in package order.
+    written: Dict[str, List[str]]
+        Files written by each written package.
+    skipped: Dict[str, List[str]]
+        Files of each package that was unchanged since they were last written, and were not written again.
+    """
+    timings: Dict[str, float]
+    written: Dict[str, List[str]]
+    skipped: Dict[str, List[str]]
+
+
+def content_digest(*values) -> str:
+    """
+    Content hash of Python values: numbers, strings, NumPy arrays, containers and objects, whose attributes are
+    hashed recursively. Values with the same content hash equally.
+
+    :param values: Any
+    :return: str
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for value in values:
+        _update(digest, value, set())
+    return digest.hexdigest()
+
+
+def _update(digest, value, seen: set):
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes, np.generic)):
+        digest.update(f"{type(value).__name__}:{value!r};".encode())
+    elif isinstance(value, np.ndarray):
+        array = np.ascontiguousarray(value)
+        digest.update(f"ndarray:{array.dtype.str}{array.shape};".encode())
+        if array.dtype.hasobject:
+            for item in array.reshape(-1).tolist():
+                _update(digest, item, seen)
+        else:
+            digest.update(array.reshape(-1).view(np.uint8))
+    elif id(value) in seen:
+        digest.update(f"<{type(value).__name__}>;".encode())
+    elif isinstance(value, dict):
+        seen.add(id(value))
+        digest.update(f"dict:{len(value)};".encode())
+        for key, item in value.items():
+            _update(digest, key, seen)
+            _update(digest, item, seen)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        seen.add(id(value))
+        digest.update(f"{type(value).__name__}:{len(value)};".encode())
+        for item in (sorted(value, key=repr) if isinstance(value, (set, frozenset)) else value):
+            _update(digest, item, seen)
+    elif hasattr(value, "__dict__") or hasattr(type(value), "__slots__"):
+        seen.add(id(value))
+        if hasattr(value, "__dict__"):
+            state = vars(value)
+        else:
+            state = {name: getattr(value, name) for name in type(value).__slots__ if hasattr(value, name)}
+        digest.update(f"{type(value).__module__}.{type(value).__name__};".encode())
+        for name in sorted(state):
+            if name not in _SKIP_ATTRS:
+                _update(digest, name, seen)
+                _update(digest, state[name], seen)
+    else:
+        # Unknown objects are compared by their text, which may differ on every run and then always writes again
+        digest.update(f"{type(value).__name__}:{value!r};".encode())
+
+
+def package_digests(model) -> Dict[str, str]:
+    """
+    Content hash of every package of a model, together with the shared model data that its file depends on: the
+    float format, the set of packages, the layers, the control, layer and period packages, and the cell bottoms and
+    ibound.
+    The grid package also depends on every grid cell parameter.
+
+    :param model: pycomus.ComusModel
+    :return: Dict[str, str]
+    """
+    grid = model.grid_arrays
+    shared = content_digest(
+        model.float_format, sorted(model.package), model.layers,
+        [model.package.get(name) for name in (CONSTANTS.CON_PKG_NAME, CONSTANTS.BCF_LYR_PKG_NAME,
+                                              CONSTANTS.LPF_LYR_PKG_NAME, CONSTANTS.PERIOD_PKG_NAME)],
+        None if grid is None else (grid.bot, grid.ibound))
+    res = {}
+    for name, pkg in model.package.items():
+        if name == CONSTANTS.GRID_PKG_NAME:
+            res[name] = content_digest(shared, name, pkg, grid)
+        else:
+            res[name] = content_digest(shared, name, pkg)
+    return res
+
+
+def file_digest(path: str) -> str:
+    """
+    Content hash of a file.
+
+    :param path: str
+    :return: str
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(_FILE_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_entry(path: str) -> Dict[str, Union[int, str]]:
+    """
+    Manifest entry of a written file: its size, modification time and content hash.
+
+    :param path: str
+    :return: Dict[str, Union[int, str]]
+    """
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "digest": file_digest(path)}
+
+
+def is_current(folder_path: str, entry: Union[Dict, None], digest: str) -> bool:
+    """
+    True if a package with content hash `digest` was last written as recorded by its manifest `entry` and its files
+    are unchanged. A file whose size and modification time are as recorded is taken as unchanged, otherwise its
+    content hash is compared.
+
+    :param folder_path: str
+        Path of the <Data.in> directory.
+    :param entry: Dict or None
+    :param digest: str
+    :return: bool
+    """
+    if not entry or entry.get("digest") != digest or not entry.get("files"):
+        return False
+    for file_name, recorded in entry["files"].items():
+        path = os.path.join(folder_path, file_name)
+        if not os.path.isfile(path):
+            return False
+        stat = os.stat(path)
+        if stat.st_size != recorded["size"]:
+            return False
+        if stat.st_mtime_ns != recorded["mtime_ns"] and file_digest(path) != recorded["digest"]:
+            return False
+    return True
+
+
+def load_manifest(path: str) -> Dict[str, Dict]:
+    """
+    Load a manifest, an empty one if it does not exist or cannot be read.
+
+    :param path: str
+    :return: Dict[str, Dict]
+    """
+    try:
+        with open(path, "r") as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def save_manifest(path: str, manifest: Dict[str, Dict]):
+    """
+    Save a manifest, replacing the previous one at once.
+
+    :param path: str
+    :param manifest: Dict[str, Dict]
+    """
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as file:
+        json.dump(manifest, file, indent=1, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def manifest_entry(digest: str, folder_path: str, file_names: List[str]) -> Dict:
+    """
+    Manifest entry of a package written with content hash `digest` into the files `file_names`.
+
+    :param digest: str
+    :param folder_path: str
+    :param file_names: List[str]
+    :return: Dict
+    """
+    return {"digest": digest,
+            "files": {file_name: file_entry(os.path.join(folder_path, file_name)) for file_name in file_names}}
@@ -1,2 +1,6 @@
 from .ReadData import ComusData
 from .Map import ComusPlot
+from .OutArchive import ComusArchive
+from .CellList import CellList
+from .Ensemble import ComusEnsemble
+from .ResultCache import ComusResultCache
@@ -0,0 +1,38 @@
+import numpy as np
+
+import pycomus
+
+
+def build_model(rechr):
+    model = pycomus.ComusModel(model_name="Ensemble")
+    pycomus.ComusConPars(model, intblkm=2)
+    pycomus.ComusOutputPars(model)
+    pycomus.ComusDisLpf(model, num_lyr=1, num_row=4, num_col=5, row_space=50, col_space=50, lyr_type=[1])
+    pycomus.ComusGridPars(model, top=20, bot=0, ibound=1, kx=10, ky=10, kz=1, shead=15)
+    pycomus.ComusPeriod(model, [(10, 1, 1) for _ in range(3)])
+    pycomus.ComusRch(model, rechr=rechr, rech=1)
+    return model
+
+
+def test_member_periods_are_independent(tmp_path):
+    for rechr in (0.001, {i: np.full((1, 4, 5), 0.001) for i in range(3)}):
+        model = build_model(rechr)
+        ensemble = pycomus.ComusEnsemble(str(tmp_path))
+        member = ensemble.members[ensemble.add(model)]
+        periods = member.package["RCH"].rechr
+        periods[0][0, 1, 2] = 0.5
+        assert periods[1][0, 1, 2] == 0.001
+        assert periods[2][0, 1, 2] == 0.001
+        assert model.package["RCH"].rechr[0][0, 1, 2] == 0.001
+
+
+def test_shared_array_is_copied_per_period(tmp_path):
+    recharge = np.full((1, 4, 5), 0.001)
+    model = build_model({0: recharge, 1: recharge, 2: recharge})
+    ensemble = pycomus.ComusEnsemble(str(tmp_path))
+    member = ensemble.members[ensemble.add_variants(model, [{}])[0]]
+    periods = member.package["RCH"].rechr
+    periods[1][0, 0, 0] = 0.5
+    assert periods[0][0, 0, 0] == 0.001
+    assert periods[2][0, 0, 0] == 0.001
+    assert recharge[0, 0, 0] == 0.001
@@ -0,0 +1,20 @@
+import pytest
+
+import pycomus
+from pycomus.Utils.TextTable import FLOAT32_FORMAT, check_float_format
+
+
+@pytest.mark.parametrize("float_format", [None, FLOAT32_FORMAT, "%.8g", "%e", "%12.5E", "%-10.3f", "%+G"])
+def test_float_formats_are_accepted(float_format):
+    assert check_float_format(float_format) == float_format
+
+
+@pytest.mark.parametrize("float_format", ["%d", "%s", "%r", "%i", "%x", "%.8g %d", "x%.8g", "%%", "%", ".8g", 8])
+def test_other_formats_are_rejected(float_format):
+    with pytest.raises(ValueError):
+        check_float_format(float_format)
+
+
+def test_model_rejects_integer_format():
+    with pytest.raises(ValueError):
+        pycomus.ComusModel(model_name="Format", float_format="%d")